@@ -4,12 +4,11 @@ Main entry point for the Solana MCP Server.
 """
 
 import sys
-import asyncio
-from solana_mcp_server import main
+from solana_mcp_server import run
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        run()
     except KeyboardInterrupt:
         print("\nServer stopped by user")
         sys.exit(0)
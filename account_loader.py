@@ -0,0 +1,184 @@
+"""
+getMultipleAccounts fan-in for the Solana MCP Server.
+
+Single-account lookups issued concurrently are merged into
+``getMultipleAccounts`` calls (up to 100 keys each) and the results are
+split back per caller in the same shape as a ``getAccountInfo`` response.
+Bulk lookups are split into chunks sent as parallel HTTP requests.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of keys accepted by getMultipleAccounts
+MAX_MULTIPLE_ACCOUNTS = 100
+
+# Makes a JSON-RPC call (optionally hedged) and returns its result
+RequestFunc = Callable[..., Awaitable[Any]]
+
+class AccountLoader:
+    """Merges concurrent account lookups into getMultipleAccounts calls."""
+
+    def __init__(
+        self,
+        request: RequestFunc,
+        window: float = 0.003,
+        max_keys: int = MAX_MULTIPLE_ACCOUNTS,
+        max_concurrency: int = 8,
+        bulk_request: Optional[RequestFunc] = None,
+    ):
+        """
+        Initialize the loader.
+
+        Args:
+            request: Coroutine that performs a JSON-RPC call
+            window: Seconds to collect lookups before flushing
+            max_keys: Keys per getMultipleAccounts call (at most 100)
+            max_concurrency: Chunks fetched in parallel by load_many
+            bulk_request: Coroutine that performs a JSON-RPC call as its own HTTP
+                request, used by load_many (defaults to ``request``)
+        """
+        self._request = request
+        self._bulk_request = bulk_request or request
+        self.window = window
+        self.max_keys = min(max_keys, MAX_MULTIPLE_ACCOUNTS)
+        self.max_concurrency = max_concurrency
+        # commitment -> address -> waiting futures
+        self._pending: Dict[str, Dict[str, List[asyncio.Future]]] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._hedged: set = set()
+        self._tasks: set = set()
+
+        self.lookups = 0
+        self.rpc_calls = 0
+
+    async def load(self, address: str, commitment: str, hedge: bool = False) -> Dict[str, Any]:
+        """
+        Load one account, sharing a getMultipleAccounts call with concurrent lookups.
+
+        Args:
+            address: Base58 account address
+            commitment: Commitment level
+            hedge: Allow a hedged request for the shared call
+
+        Returns:
+            Dict: ``{"context": {"slot": ...}, "value": account or None}``
+        """
+        self.lookups += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(commitment, {})
+        pending.setdefault(address, []).append(future)
+        if hedge:
+            self._hedged.add(commitment)
+
+        if len(pending) >= self.max_keys:
+            self._schedule_flush(commitment)
+        elif commitment not in self._flush_handles:
+            self._flush_handles[commitment] = loop.call_later(self.window, self._schedule_flush, commitment)
+
+        return await future
+
+    async def load_many(
+        self,
+        addresses: List[str],
+        commitment: str,
+        hedge: bool = False,
+        data_slice: Optional[Dict[str, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Load many accounts with concurrent getMultipleAccounts calls.
+
+        Chunks go through ``bulk_request``, so at most ``max_concurrency``
+        HTTP requests are in flight at once (a JSON-RPC batcher would merge
+        them back into a single sequential POST).
+
+        Args:
+            addresses: Base58 account addresses (duplicates allowed)
+            commitment: Commitment level
+            hedge: Allow hedged requests
+            data_slice: Optional ``{"offset", "length"}`` limiting the returned account data
+
+        Returns:
+            List[Dict]: One ``{"context", "value"}`` entry per input address, in order
+        """
+        self.lookups += len(addresses)
+        unique = list(dict.fromkeys(addresses))
+        chunks = [unique[i:i + self.max_keys] for i in range(0, len(unique), self.max_keys)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+            async with semaphore:
+                return await self._fetch(chunk, commitment, hedge, data_slice, self._bulk_request)
+
+        results = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+
+        by_address: Dict[str, Dict[str, Any]] = {}
+        for chunk_result in results:
+            by_address.update(chunk_result)
+        return [by_address[address] for address in addresses]
+
+    async def _fetch(
+        self,
+        addresses: List[str],
+        commitment: str,
+        hedge: bool = False,
+        data_slice: Optional[Dict[str, int]] = None,
+        request: Optional[RequestFunc] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch one chunk of accounts and split the response per address."""
+        self.rpc_calls += 1
+        config = {"encoding": "base64", "commitment": commitment}
+        if data_slice is not None:
+            config["dataSlice"] = data_slice
+        request = request or self._request
+        response = await request("getMultipleAccounts", [addresses, config], hedge=hedge)
+        context = response.get("context", {})
+        values = response.get("value") or [None] * len(addresses)
+        return {
+            address: {"context": context, "value": value}
+            for address, value in zip(addresses, values)
+        }
+
+    def _schedule_flush(self, commitment: str):
+        """Hand the pending lookups for a commitment to a flush task."""
+        handle = self._flush_handles.pop(commitment, None)
+        if handle is not None:
+            handle.cancel()
+
+        pending = self._pending.pop(commitment, None)
+        hedge = commitment in self._hedged
+        self._hedged.discard(commitment)
+        if not pending:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._flush(pending, commitment, hedge))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, pending: Dict[str, List[asyncio.Future]], commitment: str, hedge: bool = False):
+        """Resolve pending lookups from a single getMultipleAccounts call."""
+        try:
+            results = await self._fetch(list(pending.keys()), commitment, hedge)
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for address, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(results[address])
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup and fan-in counters."""
+        return {
+            "lookups": self.lookups,
+            "rpc_calls": self.rpc_calls,
+            "pending": sum(len(pending) for pending in self._pending.values()),
+        }
@@ -3,10 +3,17 @@ Configuration management for Solana MCP Server.
 """
 
 import os
-from typing import Optional
-from dataclasses import dataclass
+from typing import List, Optional
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
+# Approximate Solana slot duration in seconds
+SLOT_DURATION = 0.4
+
+def _split_list(value: Optional[str]) -> List[str]:
+    """Parse a comma-separated list."""
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
 @dataclass
 class NetworkConfig:
     """Network-specific configuration."""
@@ -14,6 +21,11 @@ class NetworkConfig:
     rpc_url: str
     ws_url: Optional[str] = None
     explorer_url: Optional[str] = None
+    rpc_urls: List[str] = field(default_factory=list)
+    
+    def __post_init__(self):
+        # The primary RPC URL always comes first in the endpoint list
+        self.rpc_urls = list(dict.fromkeys([self.rpc_url, *self.rpc_urls]))
 
 @dataclass
 class SecurityConfig:
@@ -49,19 +61,22 @@ class Config:
                 name="mainnet",
                 rpc_url=os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com"),
                 ws_url=os.getenv("SOLANA_WS_URL", "wss://api.mainnet-beta.solana.com"),
-                explorer_url="https://explorer.solana.com"
+                explorer_url="https://explorer.solana.com",
+                rpc_urls=_split_list(os.getenv("SOLANA_RPC_URLS"))
             ),
             "devnet": NetworkConfig(
                 name="devnet",
                 rpc_url=os.getenv("SOLANA_DEVNET_RPC_URL", "https://api.devnet.solana.com"),
                 ws_url=os.getenv("SOLANA_DEVNET_WS_URL", "wss://api.devnet.solana.com"),
-                explorer_url="https://explorer.solana.com?cluster=devnet"
+                explorer_url="https://explorer.solana.com?cluster=devnet",
+                rpc_urls=_split_list(os.getenv("SOLANA_DEVNET_RPC_URLS"))
             ),
             "testnet": NetworkConfig(
                 name="testnet",
                 rpc_url=os.getenv("SOLANA_TESTNET_RPC_URL", "https://api.testnet.solana.com"),
                 ws_url=os.getenv("SOLANA_TESTNET_WS_URL", "wss://api.testnet.solana.com"),
-                explorer_url="https://explorer.solana.com?cluster=testnet"
+                explorer_url="https://explorer.solana.com?cluster=testnet",
+                rpc_urls=_split_list(os.getenv("SOLANA_TESTNET_RPC_URLS"))
             )
         }
         
@@ -75,6 +90,40 @@ class Config:
         # Commitment level
         self.commitment = os.getenv("DEFAULT_COMMITMENT", "confirmed")
         
+        # RPC connection pool
+        self.rpc_pool_size = int(os.getenv("RPC_POOL_SIZE", "8"))
+        self.rpc_timeout = float(os.getenv("RPC_TIMEOUT", "10"))
+        self.rpc_keepalive_expiry = float(os.getenv("RPC_KEEPALIVE_EXPIRY", "60"))
+        
+        # RPC endpoint routing and failover
+        self.rpc_endpoint_cooldown = float(os.getenv("RPC_ENDPOINT_COOLDOWN", "5"))
+        self.rpc_max_slot_lag = int(os.getenv("RPC_MAX_SLOT_LAG", "10"))
+        self.rpc_health_interval = float(os.getenv("RPC_HEALTH_INTERVAL", "10"))
+        
+        # Hedged read requests (comma-separated tool names, empty disables)
+        self.rpc_hedge_tools = set(_split_list(os.getenv("RPC_HEDGE_TOOLS", "")))
+        self.rpc_hedge_budget = float(os.getenv("RPC_HEDGE_BUDGET", "0.1"))
+        self.rpc_hedge_delay_ms = float(os.getenv("RPC_HEDGE_DELAY_MS", "500"))
+        
+        # JSON-RPC batching (window of 0 disables batching)
+        self.rpc_batch_window_ms = float(os.getenv("RPC_BATCH_WINDOW_MS", "3"))
+        self.rpc_batch_max_size = int(os.getenv("RPC_BATCH_MAX_SIZE", "100"))
+        self.rpc_max_concurrent_chunks = int(os.getenv("RPC_MAX_CONCURRENT_CHUNKS", "8"))
+        
+        # RPC response cache (TTL in seconds per commitment level, 0 disables)
+        self.rpc_cache_size = int(os.getenv("RPC_CACHE_SIZE", "10000"))
+        self.rpc_cache_ttls = {
+            "processed": float(os.getenv("RPC_CACHE_TTL_PROCESSED", "0.4")),
+            "confirmed": float(os.getenv("RPC_CACHE_TTL_CONFIRMED", "2")),
+            "finalized": float(os.getenv("RPC_CACHE_TTL_FINALIZED", "30"))
+        }
+        
+        # WebSocket subscriptions (watched accounts are pushed into the RPC cache instead of polled)
+        self.ws_subscriptions = os.getenv("ENABLE_WS_SUBSCRIPTIONS", "true").lower() == "true"
+        self.ws_watch_accounts = _split_list(os.getenv("WS_WATCH_ACCOUNTS"))
+        self.ws_reconnect_max_delay = float(os.getenv("WS_RECONNECT_MAX_DELAY", "30"))
+        self.ws_ping_interval = float(os.getenv("WS_PING_INTERVAL", "20"))
+        
         # Security configuration
         self.security = SecurityConfig(
             max_transaction_amount=float(os.getenv("MAX_TRANSACTION_AMOUNT", "1.0")),
@@ -82,17 +131,84 @@ class Config:
             rate_limit_per_minute=int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
         )
         
+        # Upstream rate limits in requests per minute (0 disables)
+        self.upstream_rate_limits = {
+            "rpc": float(os.getenv("RPC_RATE_LIMIT_PER_MINUTE", "600")),
+            "coingecko": float(os.getenv("COINGECKO_RATE_LIMIT_PER_MINUTE", "30")),
+            "jupiter": float(os.getenv("JUPITER_RATE_LIMIT_PER_MINUTE", "600"))
+        }
+        
         # API Keys
         self.jupiter_api_key = os.getenv("JUPITER_API_KEY")
         self.coingecko_api_key = os.getenv("COINGECKO_API_KEY")
         
+        # Persistent store for finalized transactions (empty path keeps them in memory only)
+        self.tx_store_path = os.getenv("TX_STORE_PATH", "~/.cache/solana-mcp-server/transactions.db")
+        self.tx_store_memory_size = int(os.getenv("TX_STORE_MEMORY_SIZE", "1024"))
+        
+        # Mint metadata registry (empty path keeps mints in memory only)
+        self.mint_registry_path = os.getenv("MINT_REGISTRY_PATH", "~/.cache/solana-mcp-server/mints.db")
+        self.mint_refresh_interval = float(os.getenv("MINT_REFRESH_INTERVAL", "3600"))
+        
+        # External APIs
+        self.coingecko_api_url = os.getenv("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
+        
+        # Price cache (stale prices are served while they are refreshed in the background)
+        self.price_cache_ttl = float(os.getenv("PRICE_CACHE_TTL", "30"))
+        self.price_stale_ttl = float(os.getenv("PRICE_STALE_TTL", "300"))
+        self.price_batch_window_ms = float(os.getenv("PRICE_BATCH_WINDOW_MS", "10"))
+        
+        # Swap quote cache (QUOTE_CACHE_TTL_SLOTS, if set, overrides the millisecond TTL)
+        quote_ttl_slots = os.getenv("QUOTE_CACHE_TTL_SLOTS")
+        if quote_ttl_slots:
+            self.quote_cache_ttl = int(quote_ttl_slots) * SLOT_DURATION
+        else:
+            self.quote_cache_ttl = float(os.getenv("QUOTE_CACHE_TTL_MS", "2000")) / 1000
+        self.quote_amount_bucket_bps = int(os.getenv("QUOTE_AMOUNT_BUCKET_BPS", "10"))
+        
+        # Best-execution quoting (concurrent quote variants, optionally across Jupiter-compatible aggregators)
+        self.swap_best_execution = os.getenv("SWAP_BEST_EXECUTION", "false").lower() == "true"
+        self.swap_quote_budget_ms = float(os.getenv("SWAP_QUOTE_BUDGET_MS", "800"))
+        self.swap_secondary_quote_urls = _split_list(os.getenv("SWAP_SECONDARY_QUOTE_URLS"))
+        
+        # Priority fee estimation for swaps (percentile of recent prioritization fees, 0 disables)
+        self.swap_priority_fee_percentile = int(os.getenv("SWAP_PRIORITY_FEE_PERCENTILE", "75"))
+        self.swap_max_priority_fee = int(os.getenv("SWAP_MAX_PRIORITY_FEE_MICROLAMPORTS", "1000000"))
+
+        # Local signing and submission of swaps with the configured private key (opt-in)
+        self.swap_local_execution = os.getenv("SWAP_LOCAL_EXECUTION", "false").lower() == "true"
+        self.swap_confirm_timeout = float(os.getenv("SWAP_CONFIRM_TIMEOUT", "60"))
+        self.swap_confirm_poll_ms = float(os.getenv("SWAP_CONFIRM_POLL_MS", "500"))
+        
+        # Background price poller (keeps watchlist and recently requested prices in memory)
+        self.price_poller_enabled = os.getenv("PRICE_POLLER_ENABLED", "false").lower() == "true"
+        self.price_watchlist = _split_list(os.getenv("PRICE_WATCHLIST", "SOL,USDC,USDT,JUP,BONK"))
+        self.price_poll_interval = float(os.getenv("PRICE_POLL_INTERVAL", "15"))
+        self.price_poll_max_interval = float(os.getenv("PRICE_POLL_MAX_INTERVAL", "300"))
+        self.price_demand_window = float(os.getenv("PRICE_DEMAND_WINDOW", "600"))
+        self.jupiter_api_url = os.getenv("JUPITER_API_URL", "https://quote-api.jup.ag/v6")
+        
+        # Shared HTTP session for external APIs
+        self.http_max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "32"))
+        self.http_max_connections_per_host = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "8"))
+        self.http_keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+        self.http_timeout = float(os.getenv("HTTP_TIMEOUT", "10"))
+        
         # Logging
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
         self.log_file = os.getenv("LOG_FILE")
         
+        # Tool responses (compact JSON unless pretty output is requested)
+        self.response_pretty = os.getenv("RESPONSE_PRETTY", "false").lower() == "true"
+        self.response_structured = os.getenv("RESPONSE_STRUCTURED", "false").lower() == "true"
+        
         # Server configuration
         self.server_host = os.getenv("SERVER_HOST", "localhost")
         self.server_port = int(os.getenv("SERVER_PORT", "8000"))
+        self.server_transport = os.getenv("SERVER_TRANSPORT", "stdio")
+        self.server_workers = int(os.getenv("SERVER_WORKERS", "1"))
+        # Stateless streamable HTTP needs no session affinity between workers
+        self.server_stateless_http = os.getenv("SERVER_STATELESS_HTTP", "true").lower() == "true"
         
         # Feature flags
         self.enable_defi_tools = os.getenv("ENABLE_DEFI_TOOLS", "true").lower() == "true"
@@ -162,6 +278,12 @@ class Config:
         if self.security.rate_limit_per_minute <= 0:
             issues.append("Rate limit must be positive")
         
+        if self.rpc_pool_size <= 0:
+            issues.append("RPC pool size must be positive")
+        
+        if self.http_max_connections <= 0 or self.http_max_connections_per_host <= 0:
+            issues.append("HTTP connection limits must be positive")
+        
         return issues
     
     def to_dict(self) -> dict:
@@ -169,19 +291,40 @@ class Config:
         return {
             "current_network": self.current_network,
             "commitment": self.commitment,
+            "rpc_pool": {
+                "size": self.rpc_pool_size,
+                "timeout": self.rpc_timeout,
+                "keepalive_expiry": self.rpc_keepalive_expiry,
+                "batch_window_ms": self.rpc_batch_window_ms,
+                "batch_max_size": self.rpc_batch_max_size,
+                "max_concurrent_chunks": self.rpc_max_concurrent_chunks,
+                "cache_size": self.rpc_cache_size,
+                "cache_ttls": self.rpc_cache_ttls
+            },
+            "ws_subscriptions": {
+                "enabled": self.ws_subscriptions,
+                "watch_accounts": self.ws_watch_accounts,
+                "reconnect_max_delay": self.ws_reconnect_max_delay,
+                "ping_interval": self.ws_ping_interval
+            },
             "security": {
                 "max_transaction_amount": self.security.max_transaction_amount,
                 "require_confirmation": self.security.require_confirmation,
                 "rate_limit_per_minute": self.security.rate_limit_per_minute
             },
+            "upstream_rate_limits": self.upstream_rate_limits,
             "features": {
                 "defi_tools": self.enable_defi_tools,
                 "nft_tools": self.enable_nft_tools,
-                "market_data": self.enable_market_data
+                "market_data": self.enable_market_data,
+                "local_swap_execution": self.swap_local_execution
             },
             "server": {
                 "host": self.server_host,
-                "port": self.server_port
+                "port": self.server_port,
+                "transport": self.server_transport,
+                "workers": self.server_workers,
+                "stateless_http": self.server_stateless_http
             }
         }
 
@@ -0,0 +1,78 @@
+"""
+Shared HTTP session for external APIs used by the Solana MCP Server.
+
+CoinGecko and Jupiter calls go through a single server-lifetime
+``httpx.AsyncClient`` so DNS lookups, TCP connections and TLS sessions
+are reused across tool calls.
+"""
+
+import functools
+import ssl
+from typing import Dict, Iterable
+from urllib.parse import urlparse
+
+import httpx
+
+from config import Config
+from utils import is_http2_available
+
+def _host_pattern(url: str) -> str:
+    """Build an httpx mount pattern (scheme://host) for a URL."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+@functools.lru_cache(maxsize=None)
+def ssl_context() -> ssl.SSLContext:
+    """
+    Get the process-wide TLS context shared by all HTTP clients.
+
+    Loading the CA bundle is the most expensive part of creating a client,
+    so it is done once instead of once per client and transport.
+
+    Returns:
+        ssl.SSLContext: Context verifying servers against the certifi bundle
+    """
+    import certifi
+
+    return ssl.create_default_context(cafile=certifi.where())
+
+def create_http_session(config: Config, hosts: Iterable[str] = ()) -> httpx.AsyncClient:
+    """
+    Create the shared HTTP client for external API calls.
+
+    Each known API host gets its own transport so a slow provider cannot
+    exhaust the connections available to the others.
+
+    Args:
+        config: Server configuration
+        hosts: Extra base URLs that should get a dedicated per-host pool
+
+    Returns:
+        httpx.AsyncClient: Configured client (close with ``aclose()``)
+    """
+    http2 = is_http2_available()
+    timeout = httpx.Timeout(config.http_timeout, connect=min(config.http_timeout, 5.0))
+
+    per_host_limits = httpx.Limits(
+        max_connections=config.http_max_connections_per_host,
+        max_keepalive_connections=config.http_max_connections_per_host,
+        keepalive_expiry=config.http_keepalive_expiry,
+    )
+    mounts: Dict[str, httpx.AsyncBaseTransport] = {}
+    for url in (config.coingecko_api_url, config.jupiter_api_url, *hosts):
+        mounts[_host_pattern(url)] = httpx.AsyncHTTPTransport(
+            verify=ssl_context(), http2=http2, limits=per_host_limits
+        )
+
+    return httpx.AsyncClient(
+        verify=ssl_context(),
+        http2=http2,
+        timeout=timeout,
+        headers={"Accept": "application/json"},
+        mounts=mounts,
+        limits=httpx.Limits(
+            max_connections=config.http_max_connections,
+            max_keepalive_connections=config.http_max_connections,
+            keepalive_expiry=config.http_keepalive_expiry,
+        ),
+    )
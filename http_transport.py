@@ -0,0 +1,128 @@
+"""
+HTTP transports for the Solana MCP Server.
+
+Serves MCP over streamable HTTP (``/mcp``) and the legacy SSE transport
+(``/sse`` with messages posted to ``/messages/``) from a single ASGI app,
+so one process handles many concurrent clients. Each worker process
+creates one ``SolanaMCPServer`` whose RPC pools, HTTP session and caches
+are shared by all sessions served by that worker.
+"""
+
+import contextlib
+import functools
+import logging
+import os
+from typing import AsyncIterator, Optional
+
+import uvicorn
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+
+from config import config as app_config
+
+logger = logging.getLogger(__name__)
+
+STREAMABLE_HTTP_PATH = "/mcp"
+SSE_PATH = "/sse"
+SSE_MESSAGES_PATH = "/messages/"
+
+class _ASGIEndpoint:
+    """Wraps an ASGI callable so Starlette routes requests to it unmodified."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+def create_app(workers: Optional[int] = None) -> Starlette:
+    """
+    Create the ASGI app serving the MCP server over HTTP.
+
+    Used as a uvicorn app factory, so every worker process builds its own
+    server instance. The SSE routes are only served by a single worker.
+
+    Args:
+        workers: Number of worker processes serving the app (default: ``SERVER_WORKERS``)
+
+    Returns:
+        Starlette: App with the streamable HTTP, SSE and health routes
+    """
+    if workers is None:
+        workers = app_config.server_workers
+    from solana_mcp_server import SolanaMCPServer
+
+    server_instance = SolanaMCPServer()
+    session_manager = StreamableHTTPSessionManager(
+        app=server_instance.server, stateless=app_config.server_stateless_http
+    )
+    sse = SseServerTransport(SSE_MESSAGES_PATH)
+
+    async def handle_sse(request: Request) -> Response:
+        async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+            await server_instance.server.run(
+                read_stream, write_stream, server_instance.initialization_options()
+            )
+        return Response()
+
+    async def handle_health(request: Request) -> Response:
+        return JSONResponse({"status": "ok", "rpc": server_instance.rpc_pool.health()})
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        server_instance.start()
+        try:
+            async with session_manager.run():
+                yield
+        finally:
+            await server_instance.close()
+
+    routes = [
+        Route(STREAMABLE_HTTP_PATH, endpoint=_ASGIEndpoint(session_manager.handle_request)),
+        Route("/health", endpoint=handle_health, methods=["GET"]),
+    ]
+    if workers == 1:
+        routes += [
+            Route(SSE_PATH, endpoint=handle_sse, methods=["GET"]),
+            Mount(SSE_MESSAGES_PATH, app=sse.handle_post_message),
+        ]
+    else:
+        # An SSE stream and the messages posted for it must reach the same
+        # process, which a shared socket does not guarantee
+        logger.warning("SSE transport is disabled with multiple workers; use streamable HTTP")
+    return Starlette(routes=routes, lifespan=lifespan)
+
+def serve_http(host: str, port: int, workers: int = 1):
+    """
+    Serve the MCP server over HTTP until interrupted.
+
+    With more than one worker, uvicorn starts worker processes that accept
+    connections on the same listening socket. Streamable HTTP sessions
+    should then be stateless (``SERVER_STATELESS_HTTP``), since consecutive
+    requests of a session may reach different workers.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+        workers: Number of worker processes
+    """
+    logger.info(f"Serving MCP over HTTP on {host}:{port} ({workers} worker(s))")
+    if workers == 1:
+        # Built in this process, whose configuration is already loaded
+        app = functools.partial(create_app, workers=1)
+    else:
+        # Worker processes import the factory and load their configuration from the environment
+        os.environ["SERVER_WORKERS"] = str(workers)
+        app = "http_transport:create_app"
+    uvicorn.run(
+        app,
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        log_level=app_config.log_level.lower(),
+    )
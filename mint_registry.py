@@ -0,0 +1,312 @@
+"""
+Mint metadata registry for the Solana MCP Server.
+
+Decimals, supply and authorities of token mints are loaded lazily with
+batched ``getMultipleAccounts`` calls, kept in memory indexed by mint
+and symbol, persisted to a local SQLite database so they survive
+restarts, and refreshed in the background.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from rpc_pool import RPCClientPool
+from token_decoder import account_data, decode_mint, is_token_program
+from utils import COMMON_TOKENS, format_token_amount
+
+logger = logging.getLogger(__name__)
+
+# Symbols in COMMON_TOKENS refer to mainnet mints
+SYMBOL_NETWORK = "mainnet"
+
+@dataclass
+class MintInfo:
+    """Cached metadata of a token mint."""
+    mint: str
+    decimals: int
+    supply: int
+    mint_authority: Optional[str]
+    freeze_authority: Optional[str]
+    program: str
+    symbol: Optional[str]
+    updated_at: float
+
+class MintRegistry:
+    """Lazily loaded, persisted and periodically refreshed mint metadata."""
+
+    def __init__(self, rpc_pool: RPCClientPool, path: Optional[str], refresh_interval: float = 3600.0):
+        """
+        Initialize the registry.
+
+        Args:
+            rpc_pool: Pool used to load mint accounts
+            path: SQLite database file (None or empty keeps mints in memory only)
+            refresh_interval: Seconds between background refreshes of supply and authorities (0 disables)
+        """
+        self.rpc_pool = rpc_pool
+        self.path = os.path.expanduser(path) if path else None
+        self.refresh_interval = refresh_interval
+        self._mints: Dict[Tuple[str, str], MintInfo] = {}
+        self._symbols: Dict[str, str] = {symbol: mint for symbol, mint in COMMON_TOKENS.items()}
+        self._names: Dict[str, str] = {mint: symbol for symbol, mint in COMMON_TOKENS.items()}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._opened = False
+
+        self.hits = 0
+        self.misses = 0
+        self.rpc_loads = 0
+        self.refreshes = 0
+
+    def _ensure_open(self):
+        """Open the database and load persisted mints on first use, so construction touches no files."""
+        if self._opened:
+            return
+        self._opened = True
+        if self.path:
+            try:
+                self._open()
+                self._load()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Mint registry persistence disabled, cannot open {self.path}: {e}")
+                self._db = None
+
+    def _open(self):
+        """Open (and create if needed) the SQLite database."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS mints ("
+            " network TEXT NOT NULL,"
+            " mint TEXT NOT NULL,"
+            " decimals INTEGER NOT NULL,"
+            " supply TEXT NOT NULL,"
+            " mint_authority TEXT,"
+            " freeze_authority TEXT,"
+            " program TEXT NOT NULL,"
+            " symbol TEXT,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (network, mint)"
+            ") WITHOUT ROWID"
+        )
+
+    def _load(self):
+        """Load every persisted mint into memory."""
+        rows = self._db.execute(
+            "SELECT network, mint, decimals, supply, mint_authority, freeze_authority, program, symbol, updated_at"
+            " FROM mints"
+        ).fetchall()
+        for network, mint, decimals, supply, mint_authority, freeze_authority, program, symbol, updated_at in rows:
+            self._remember(network, MintInfo(
+                mint=mint,
+                decimals=decimals,
+                supply=int(supply),
+                mint_authority=mint_authority,
+                freeze_authority=freeze_authority,
+                program=program,
+                symbol=symbol,
+                updated_at=updated_at,
+            ))
+
+    def _remember(self, network: str, info: MintInfo):
+        """Index a mint by address and symbol."""
+        self._mints[(network, info.mint)] = info
+        if info.symbol and network == SYMBOL_NETWORK:
+            self._symbols.setdefault(info.symbol.upper(), info.mint)
+            self._names.setdefault(info.mint, info.symbol.upper())
+
+    def _write(self, network: str, infos: List[MintInfo]):
+        """Persist mints to disk."""
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO mints"
+                " (network, mint, decimals, supply, mint_authority, freeze_authority, program, symbol, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (network, info.mint, info.decimals, str(info.supply), info.mint_authority,
+                     info.freeze_authority, info.program, info.symbol, info.updated_at)
+                    for info in infos
+                ],
+            )
+
+    def resolve(self, token: str) -> Optional[str]:
+        """
+        Resolve a symbol (e.g. ``"USDC"``) or mint address to a mint address.
+
+        Args:
+            token: Symbol or base58 mint address
+
+        Returns:
+            Optional[str]: Mint address, or None for unknown symbols
+        """
+        self._ensure_open()
+        mint = self._symbols.get(token.upper())
+        if mint is not None:
+            return mint
+        # Base58 mint addresses are 32-44 characters; symbols are much shorter
+        return token if len(token) >= 32 else None
+
+    def symbol(self, mint: str) -> Optional[str]:
+        """
+        Get the known symbol of a mint.
+
+        Args:
+            mint: Base58 mint address
+
+        Returns:
+            Optional[str]: Symbol, or None if unknown
+        """
+        self._ensure_open()
+        return self._names.get(mint)
+
+    async def get(self, mint: str, network: Optional[str] = None) -> Optional[MintInfo]:
+        """
+        Get metadata for one mint.
+
+        Args:
+            mint: Base58 mint address
+            network: Network name (default: current network)
+
+        Returns:
+            Optional[MintInfo]: Metadata, or None if the account is not a token mint
+        """
+        return (await self.get_many([mint], network)).get(mint)
+
+    async def get_many(self, mints: Iterable[str], network: Optional[str] = None) -> Dict[str, MintInfo]:
+        """
+        Get metadata for many mints, loading unknown ones with batched RPC calls.
+
+        Args:
+            mints: Base58 mint addresses
+            network: Network name (default: current network)
+
+        Returns:
+            Dict[str, MintInfo]: Metadata per mint (mints that could not be decoded are omitted)
+        """
+        network = network or self.rpc_pool.config.current_network
+        self._ensure_open()
+        self._ensure_refresh()
+
+        found: Dict[str, MintInfo] = {}
+        missing = []
+        for mint in dict.fromkeys(mints):
+            info = self._mints.get((network, mint))
+            if info is not None:
+                self.hits += 1
+                found[mint] = info
+            else:
+                self.misses += 1
+                missing.append(mint)
+
+        if missing:
+            found.update(await self._fetch(network, missing))
+        return found
+
+    async def _fetch(self, network: str, mints: List[str]) -> Dict[str, MintInfo]:
+        """Load mints from the network, index and persist them."""
+        self.rpc_loads += 1
+        pool = self.rpc_pool.get(network)
+        responses = await pool.get_accounts(mints, "finalized")
+
+        infos: Dict[str, MintInfo] = {}
+        now = time.time()
+        for mint, response in zip(mints, responses):
+            account = response.get("value")
+            if not account or not is_token_program(account.get("owner", "")):
+                continue
+            try:
+                decoded = decode_mint(account_data(account))
+            except ValueError as e:
+                logger.debug(f"Skipping mint {mint}: {e}")
+                continue
+            info = MintInfo(
+                mint=mint,
+                decimals=decoded.decimals,
+                supply=decoded.supply,
+                mint_authority=decoded.mint_authority,
+                freeze_authority=decoded.freeze_authority,
+                program=account["owner"],
+                symbol=self._names.get(mint) if network == SYMBOL_NETWORK else None,
+                updated_at=now,
+            )
+            self._remember(network, info)
+            infos[mint] = info
+
+        if infos and self._db is not None:
+            try:
+                await asyncio.to_thread(self._write, network, list(infos.values()))
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist mints: {e}")
+        return infos
+
+    async def format_amount(self, amount: int, mint: str, network: Optional[str] = None) -> Optional[float]:
+        """
+        Convert a raw token amount to UI units using the mint's cached decimals.
+
+        Args:
+            amount: Raw token amount
+            mint: Base58 mint address
+            network: Network name (default: current network)
+
+        Returns:
+            Optional[float]: Formatted amount, or None if the mint is unknown
+        """
+        info = await self.get(mint, network)
+        return format_token_amount(amount, info.decimals) if info is not None else None
+
+    def _ensure_refresh(self):
+        """Start the background refresh on first use."""
+        if self._refresh_task is None and self.refresh_interval > 0:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        """Periodically reload supply and authorities of mints that have gone stale."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            cutoff = time.time() - self.refresh_interval
+            stale: Dict[str, List[str]] = {}
+            for (network, mint), info in list(self._mints.items()):
+                if info.updated_at <= cutoff:
+                    stale.setdefault(network, []).append(mint)
+            for network, mints in stale.items():
+                try:
+                    await self._fetch(network, mints)
+                    self.refreshes += len(mints)
+                except Exception as e:
+                    logger.warning(f"Mint refresh failed on {network}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return registry counters."""
+        return {
+            "path": self.path if self._db is not None else None,
+            "mints": len(self._mints),
+            "symbols": len(self._symbols),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rpc_loads": self.rpc_loads,
+            "refreshed": self.refreshes,
+        }
+
+    async def close(self):
+        """Stop the background refresh and close the database."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
@@ -0,0 +1,418 @@
+"""
+Token price service for the Solana MCP Server.
+
+Price lookups issued within a short window are coalesced into a single
+CoinGecko ``simple/price?ids=a,b,c`` request (or ``simple/token_price``
+for mint addresses). Prices are cached with a short TTL; once expired
+they are still served for a while as stale values while a background
+refresh runs (stale-while-revalidate).
+
+An optional poller keeps a snapshot of watchlist and recently requested
+prices in memory, so reads can be answered without any network call.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Common Solana token symbols mapped to CoinGecko ids
+COINGECKO_IDS = {
+    "SOL": "solana",
+    "USDC": "usd-coin",
+    "USDT": "tether",
+    "RAY": "raydium",
+    "SRM": "serum",
+    "ORCA": "orca",
+    "MNGO": "mango-markets",
+    "JUP": "jupiter-exchange-solana",
+    "BONK": "bonk",
+    "WIF": "dogwifcoin",
+    "PYTH": "pyth-network",
+    "MSOL": "msol",
+    "JITOSOL": "jito-staked-sol",
+}
+
+# CoinGecko accepts at most this many ids or contract addresses per request
+MAX_IDS_PER_REQUEST = 100
+
+# Cache keys are ("ids", coingecko id) or ("mints", mint address)
+PriceKey = Tuple[str, str]
+
+# GETs an external API URL with query parameters
+GetFunc = Callable[[str, Dict[str, Any]], Awaitable[httpx.Response]]
+
+@dataclass
+class PriceQuote:
+    """A cached USD price."""
+    price_usd: float
+    change_24h: Optional[float]
+    fetched_at: float
+
+    def age(self) -> float:
+        """Seconds since the price was fetched."""
+        return time.time() - self.fetched_at
+
+class PriceService:
+    """Coalescing, caching CoinGecko price lookups."""
+
+    def __init__(
+        self,
+        get: GetFunc,
+        base_url: str,
+        resolve_mint: Callable[[str], Optional[str]],
+        ttl: float = 30.0,
+        stale_ttl: float = 300.0,
+        window: float = 0.01,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            get: Coroutine performing a GET request
+            base_url: CoinGecko API base URL
+            resolve_mint: Maps a symbol or mint address to a mint address
+            ttl: Seconds a price is served as fresh
+            stale_ttl: Further seconds an expired price is served while it is refreshed
+            window: Seconds to collect lookups before sending a request
+        """
+        self._get = get
+        self.base_url = base_url
+        self._resolve_mint = resolve_mint
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.window = window
+        self._cache: Dict[PriceKey, PriceQuote] = {}
+        self._pending: Dict[str, Dict[str, asyncio.Future]] = {"ids": {}, "mints": {}}
+        self._in_flight: Dict[PriceKey, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._refreshing: set = set()
+        self._tasks: set = set()
+
+        self.lookups = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.requests = 0
+
+    def key(self, token: str) -> PriceKey:
+        """
+        Map a symbol, CoinGecko id or mint address to its cache key.
+
+        Args:
+            token: Symbol (e.g. ``"SOL"``), CoinGecko id or base58 mint address
+
+        Returns:
+            PriceKey: ``("ids", id)`` or ``("mints", mint)``
+        """
+        coingecko_id = COINGECKO_IDS.get(token.upper())
+        if coingecko_id is not None:
+            return ("ids", coingecko_id)
+        mint = self._resolve_mint(token)
+        if mint is not None:
+            return ("mints", mint)
+        return ("ids", token.lower())
+
+    async def get_price(self, token: str) -> Optional[PriceQuote]:
+        """
+        Get the USD price of one token.
+
+        Args:
+            token: Symbol, CoinGecko id or mint address
+
+        Returns:
+            Optional[PriceQuote]: Price, or None if unknown
+        """
+        return (await self.get_prices([token])).get(token)
+
+    async def get_prices(self, tokens: Iterable[str]) -> Dict[str, Optional[PriceQuote]]:
+        """
+        Get USD prices for many tokens, fetching all cache misses together.
+
+        Args:
+            tokens: Symbols, CoinGecko ids or mint addresses
+
+        Returns:
+            Dict[str, Optional[PriceQuote]]: Price per input token (None if unknown)
+        """
+        keys = {token: self.key(token) for token in tokens}
+        self.lookups += len(keys)
+
+        quotes: Dict[PriceKey, Optional[PriceQuote]] = {}
+        missing: List[PriceKey] = []
+        for key in dict.fromkeys(keys.values()):
+            quote = self._cache.get(key)
+            if quote is not None and quote.age() < self.ttl:
+                self.hits += 1
+                quotes[key] = quote
+            elif quote is not None and quote.age() < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                quotes[key] = quote
+                self._revalidate(key)
+            else:
+                missing.append(key)
+
+        results = await asyncio.gather(*(self._load(key) for key in missing), return_exceptions=True)
+        for key, result in zip(missing, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Price lookup failed for {key[1]}: {result}")
+                # Fall back to an expired price rather than nothing
+                quotes[key] = self._cache.get(key)
+            else:
+                quotes[key] = result
+
+        return {token: quotes.get(key) for token, key in keys.items()}
+
+    async def refresh(self, tokens: Iterable[str]) -> Dict[str, Optional[PriceQuote]]:
+        """
+        Fetch prices for many tokens regardless of the cache.
+
+        Args:
+            tokens: Symbols, CoinGecko ids or mint addresses
+
+        Returns:
+            Dict[str, Optional[PriceQuote]]: Price per input token (None if unknown)
+
+        Raises:
+            Exception: The first request error, if any request failed
+        """
+        keys = {token: self.key(token) for token in tokens}
+        unique = list(dict.fromkeys(keys.values()))
+        results = await asyncio.gather(*(self._load(key) for key in unique), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        quotes = dict(zip(unique, results))
+        return {token: quotes[key] for token, key in keys.items()}
+
+    def _revalidate(self, key: PriceKey):
+        """Refresh a stale price in the background."""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.get_running_loop().create_task(self._refresh(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: PriceKey):
+        """Reload one price, keeping the stale value on failure."""
+        try:
+            await self._load(key)
+        except Exception as e:
+            logger.warning(f"Background price refresh failed for {key[1]}: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def _load(self, key: PriceKey) -> "asyncio.Future[Optional[PriceQuote]]":
+        """
+        Queue a key for the next coalesced request, sharing an already queued or running lookup.
+
+        The shared future is shielded, so a cancelled caller does not cancel
+        the lookup for the others waiting on it.
+        """
+        kind, value = key
+        future = self._pending[kind].get(value) or self._in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[kind][value] = future
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._schedule_flush)
+        return asyncio.shield(future)
+
+    def _schedule_flush(self):
+        """Hand the queued lookups to flush tasks."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, {"ids": {}, "mints": {}}
+        loop = asyncio.get_running_loop()
+        for kind, futures in pending.items():
+            for value, future in futures.items():
+                self._in_flight[(kind, value)] = future
+            items = list(futures.items())
+            for i in range(0, len(items), MAX_IDS_PER_REQUEST):
+                task = loop.create_task(self._flush(kind, dict(items[i:i + MAX_IDS_PER_REQUEST])))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, kind: str, futures: Dict[str, asyncio.Future]):
+        """Fetch one batch of prices and resolve the waiting lookups."""
+        waiting = {value: future for value, future in futures.items() if not future.done()}
+        try:
+            if waiting:
+                self.requests += 1
+                await self._fetch(kind, waiting)
+        finally:
+            for value in futures:
+                self._in_flight.pop((kind, value), None)
+
+    async def _fetch(self, kind: str, futures: Dict[str, asyncio.Future]):
+        """Send one price request and resolve its futures."""
+        try:
+            if kind == "ids":
+                response = await self._get(f"{self.base_url}/simple/price", {
+                    "ids": ",".join(futures),
+                    "vs_currencies": "usd",
+                    "include_24hr_change": "true"
+                })
+            else:
+                response = await self._get(f"{self.base_url}/simple/token_price/solana", {
+                    "contract_addresses": ",".join(futures),
+                    "vs_currencies": "usd",
+                    "include_24hr_change": "true"
+                })
+            response.raise_for_status()
+            # CoinGecko may lower-case the contract addresses it echoes back
+            data = {name.lower(): value for name, value in response.json().items()}
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        now = time.time()
+        for value, future in futures.items():
+            price_data = data.get(value.lower()) or {}
+            quote = None
+            if price_data.get("usd") is not None:
+                quote = PriceQuote(price_data["usd"], price_data.get("usd_24h_change"), now)
+                self._cache[(kind, value)] = quote
+            if not future.done():
+                future.set_result(quote)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache and coalescing counters."""
+        return {
+            "entries": len(self._cache),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "requests": self.requests,
+        }
+
+class PricePoller:
+    """Keeps an in-memory price snapshot fresh for a watchlist of tokens."""
+
+    def __init__(
+        self,
+        service: PriceService,
+        watchlist: Iterable[str],
+        interval: float = 15.0,
+        max_interval: float = 300.0,
+        demand_window: float = 600.0,
+        rate_per_minute: float = 0.0,
+    ):
+        """
+        Initialize the poller.
+
+        Args:
+            service: Price service used for fetching
+            watchlist: Tokens that are always polled
+            interval: Poll interval while prices are being read
+            max_interval: Poll interval ceiling when idle or rate limited
+            demand_window: Seconds a requested token stays on the poll list
+            rate_per_minute: Upstream request budget; polling uses at most half of it (0 for no limit)
+        """
+        self.service = service
+        self.watchlist = list(watchlist)
+        self.base_interval = interval
+        self.max_interval = max_interval
+        self.demand_window = demand_window
+        self.rate_per_minute = rate_per_minute
+        self.interval = interval
+        # Replaced as a whole on every poll, so readers always see a consistent snapshot
+        self._snapshot: Dict[PriceKey, PriceQuote] = {}
+        self.as_of: Optional[float] = None
+        self._requested: Dict[str, float] = {}
+        self._reads = 0
+        self._task: Optional[asyncio.Task] = None
+
+        self.polls = 0
+        self.failures = 0
+        self.snapshot_hits = 0
+
+    def get(self, token: str) -> Optional[PriceQuote]:
+        """
+        Read a price from the snapshot, adding the token to the poll list.
+
+        Args:
+            token: Symbol, CoinGecko id or mint address
+
+        Returns:
+            Optional[PriceQuote]: Snapshot price, or None if the token is not polled yet
+        """
+        self._reads += 1
+        self._requested[token] = time.time()
+        quote = self._snapshot.get(self.service.key(token))
+        if quote is not None:
+            self.snapshot_hits += 1
+        return quote
+
+    def start(self):
+        """Start polling in the background."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._poll_loop())
+
+    def tokens(self) -> List[str]:
+        """Tokens to poll: the watchlist plus recently requested tokens."""
+        cutoff = time.time() - self.demand_window
+        self._requested = {token: at for token, at in self._requested.items() if at >= cutoff}
+        return list(dict.fromkeys([*self.watchlist, *self._requested]))
+
+    def _min_interval(self, tokens: int) -> float:
+        """Shortest interval that keeps polling within half of the upstream budget."""
+        if self.rate_per_minute <= 0:
+            return self.base_interval
+        requests = max(1, -(-tokens // MAX_IDS_PER_REQUEST))
+        return max(self.base_interval, 60 * requests / (self.rate_per_minute / 2))
+
+    async def poll(self):
+        """Fetch every polled token and swap in a new snapshot."""
+        tokens = self.tokens()
+        quotes = await self.service.refresh(tokens)
+        snapshot = {self.service.key(token): quote for token, quote in quotes.items() if quote is not None}
+        self._snapshot = snapshot
+        self.as_of = time.time()
+        self.polls += 1
+
+    async def _poll_loop(self):
+        """Poll on an interval that follows demand and backs off on failures."""
+        while True:
+            reads, self._reads = self._reads, 0
+            try:
+                await self.poll()
+                min_interval = self._min_interval(len(self.tokens()))
+                if reads:
+                    self.interval = min_interval
+                else:
+                    # Nobody is reading: poll less often
+                    self.interval = min(self.max_interval, max(min_interval, self.interval * 2))
+            except Exception as e:
+                self.failures += 1
+                self.interval = min(self.max_interval, self.interval * 2)
+                logger.warning(f"Price poll failed, next poll in {self.interval:.0f}s: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return snapshot and polling counters."""
+        return {
+            "tokens": len(self._snapshot),
+            "as_of": self.as_of,
+            "interval": self.interval,
+            "polls": self.polls,
+            "failures": self.failures,
+            "snapshot_hits": self.snapshot_hits,
+        }
+
+    async def close(self):
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
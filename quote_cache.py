@@ -0,0 +1,178 @@
+"""
+Short-lived swap quote cache for the Solana MCP Server.
+
+Jupiter quotes are cached per (input mint, output mint, amount bucket,
+slippage, quoting mode) for a few hundred milliseconds to a few slots, so that
+repeated quotes and retried swaps skip the quote round trip. Amounts are
+grouped into buckets of a configurable relative width; a bucketed hit is
+only used where an approximate quote is acceptable.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+QuoteKey = Tuple[str, str, int, int, bool]
+
+@dataclass
+class CachedQuote:
+    """A cached quote response."""
+    quote: Dict[str, Any]
+    amount: int
+    fetched_at: float
+    source: Optional[str] = None
+
+    def age_ms(self) -> float:
+        """Milliseconds since the quote was fetched."""
+        return (time.monotonic() - self.fetched_at) * 1000
+
+def amount_bucket(amount: int, bucket_bps: int) -> int:
+    """
+    Map an amount to its bucket.
+
+    Buckets grow geometrically, so every bucket spans roughly
+    ``bucket_bps`` basis points of the amounts it contains.
+
+    Args:
+        amount: Raw input amount
+        bucket_bps: Bucket width in basis points (0 disables bucketing)
+
+    Returns:
+        int: Bucket index
+    """
+    if bucket_bps <= 0 or amount <= 0:
+        return amount
+    return math.floor(math.log(amount) / math.log1p(bucket_bps / 10_000))
+
+class QuoteCache:
+    """TTL cache of swap quotes with amount bucketing."""
+
+    def __init__(self, ttl: float = 2.0, bucket_bps: int = 10, max_entries: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a quote stays usable
+            bucket_bps: Relative width of amount buckets in basis points (0 for exact amounts only)
+            max_entries: Maximum number of cached quotes
+        """
+        self.ttl = ttl
+        self.bucket_bps = bucket_bps
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[QuoteKey, CachedQuote]" = OrderedDict()
+
+        self.hits = 0
+        self.bucket_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def key(
+        self, input_mint: str, output_mint: str, amount: int, slippage_bps: int, best_execution: bool = False
+    ) -> QuoteKey:
+        """Build the cache key for a quote request."""
+        return (input_mint, output_mint, amount_bucket(amount, self.bucket_bps), slippage_bps, best_execution)
+
+    def get(
+        self,
+        input_mint: str,
+        output_mint: str,
+        amount: int,
+        slippage_bps: int,
+        exact: bool = True,
+        best_execution: bool = False,
+    ) -> Optional[CachedQuote]:
+        """
+        Look up a quote.
+
+        Args:
+            input_mint: Input token mint
+            output_mint: Output token mint
+            amount: Raw input amount
+            slippage_bps: Slippage tolerance in basis points
+            exact: Only accept a quote for exactly this amount (required when building a swap)
+            best_execution: Look up a best-execution quote instead of a single-route one
+
+        Returns:
+            Optional[CachedQuote]: Cached quote, or None on a miss
+        """
+        key = self.key(input_mint, output_mint, amount, slippage_bps, best_execution)
+        entry = self._entries.get(key)
+        if entry is None or entry.age_ms() >= self.ttl * 1000:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        if entry.amount != amount:
+            if exact:
+                self.misses += 1
+                return None
+            self.bucket_hits += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(
+        self,
+        input_mint: str,
+        output_mint: str,
+        amount: int,
+        slippage_bps: int,
+        quote: Dict[str, Any],
+        source: Optional[str] = None,
+        best_execution: bool = False,
+    ) -> CachedQuote:
+        """
+        Store a quote.
+
+        Args:
+            input_mint: Input token mint
+            output_mint: Output token mint
+            amount: Raw input amount the quote was requested for
+            slippage_bps: Slippage tolerance in basis points
+            quote: Quote response
+            source: Aggregator base URL the quote came from
+            best_execution: Whether the quote was chosen by best execution
+
+        Returns:
+            CachedQuote: The new cache entry
+        """
+        key = self.key(input_mint, output_mint, amount, slippage_bps, best_execution)
+        entry = CachedQuote(quote, amount, time.monotonic(), source)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, input_mint: Optional[str] = None, output_mint: Optional[str] = None) -> int:
+        """
+        Drop cached quotes, optionally only those for a token pair or a single mint.
+
+        Args:
+            input_mint: Only drop quotes with this input mint
+            output_mint: Only drop quotes with this output mint
+
+        Returns:
+            int: Number of quotes dropped
+        """
+        keys = [
+            key for key in self._entries
+            if (input_mint is None or key[0] == input_mint) and (output_mint is None or key[1] == output_mint)
+        ]
+        for key in keys:
+            del self._entries[key]
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters."""
+        return {
+            "entries": len(self._entries),
+            "ttl_ms": self.ttl * 1000,
+            "hits": self.hits,
+            "bucket_hits": self.bucket_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
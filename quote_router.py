@@ -0,0 +1,119 @@
+"""
+Best-execution quoting for the Solana MCP Server.
+
+Quote requests with different routing parameters, optionally against a
+second Jupiter-compatible aggregator, are sent concurrently. The quotes
+that arrive within a latency budget are compared by expected output and
+the best one is used for the swap.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Routing parameter sets tried for every source
+QUOTE_VARIANTS: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "direct": {"onlyDirectRoutes": "true"},
+    "restricted": {"restrictIntermediateTokens": "true"},
+}
+
+# Fetches a quote from an aggregator base URL with extra query parameters
+QuoteFetcher = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+@dataclass
+class QuoteCandidate:
+    """One quote request and its outcome."""
+    source: str
+    variant: str
+    latency_ms: float
+    quote: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def net_out_amount(self) -> int:
+        """Expected output amount (Jupiter's ``outAmount`` is already net of route and platform fees)."""
+        if self.quote is None:
+            return -1
+        return int(self.quote.get("outAmount", 0))
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact description for tool output."""
+        return {
+            "source": self.source,
+            "variant": self.variant,
+            "out_amount": self.net_out_amount if self.quote is not None else None,
+            "latency_ms": round(self.latency_ms, 1),
+            "error": self.error,
+        }
+
+async def _fetch_candidate(fetch: QuoteFetcher, source: str, variant: str, params: Dict[str, Any]) -> QuoteCandidate:
+    """Run one quote request, capturing its latency and error."""
+    started = time.perf_counter()
+    try:
+        quote = await fetch(source, params)
+        return QuoteCandidate(source, variant, (time.perf_counter() - started) * 1000, quote=quote)
+    except Exception as e:
+        error = (str(e) or type(e).__name__).splitlines()[0]
+        return QuoteCandidate(source, variant, (time.perf_counter() - started) * 1000, error=error)
+
+async def gather_quotes(
+    fetch: QuoteFetcher,
+    sources: List[str],
+    budget: float,
+    variants: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[QuoteCandidate]:
+    """
+    Request quotes for every source and variant concurrently.
+
+    Requests still running when the budget expires are cancelled, unless
+    no quote has succeeded yet, in which case the first successful one is
+    awaited.
+
+    Args:
+        fetch: Coroutine fetching a quote from a source with extra parameters
+        sources: Aggregator base URLs
+        budget: Seconds to wait for quotes
+        variants: Routing parameter sets (default: ``QUOTE_VARIANTS``)
+
+    Returns:
+        List[QuoteCandidate]: Finished requests, successful or not
+    """
+    variants = variants if variants is not None else QUOTE_VARIANTS
+    tasks = {
+        asyncio.ensure_future(_fetch_candidate(fetch, source, variant, params))
+        for source in sources
+        for variant, params in variants.items()
+    }
+
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=budget)
+        candidates = [task.result() for task in done]
+        while pending and not any(candidate.quote is not None for candidate in candidates):
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            candidates.extend(task.result() for task in finished)
+        return candidates
+    finally:
+        # Also reached when the caller is cancelled while waiting
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+def best_candidate(candidates: List[QuoteCandidate]) -> Optional[QuoteCandidate]:
+    """
+    Pick the quote with the highest expected output, preferring the faster one on ties.
+
+    Args:
+        candidates: Finished quote requests
+
+    Returns:
+        Optional[QuoteCandidate]: Best successful quote, or None if all failed
+    """
+    successful = [candidate for candidate in candidates if candidate.quote is not None]
+    if not successful:
+        return None
+    return max(successful, key=lambda candidate: (candidate.net_out_amount, -candidate.latency_ms))
@@ -0,0 +1,144 @@
+"""
+Async token-bucket rate limiting for the Solana MCP Server.
+
+Callers queue (in FIFO order) until a token is available instead of
+failing, and a bucket can be paused to honor ``Retry-After`` responses
+from an upstream provider.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Dict, Optional
+
+class TokenBucket:
+    """FIFO-queueing async token bucket."""
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate_per_minute: Sustained rate (0 or less disables limiting)
+            burst: Bucket capacity (defaults to ten seconds' worth of tokens)
+        """
+        self.rate_per_minute = rate_per_minute
+        self.rate = rate_per_minute / 60
+        self.capacity = burst if burst is not None else max(1, math.ceil(rate_per_minute / 6))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+        self.waiting = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the bucket limits anything."""
+        return self.rate > 0
+
+    def _refill(self, now: float):
+        """Add tokens accrued since the last update; none accrue while paused."""
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait for a token, queueing behind earlier callers."""
+        if not self.enabled:
+            # Unlimited buckets still honor pauses requested by the upstream
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return
+
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self._paused_until:
+                        await asyncio.sleep(self._paused_until - now)
+                        continue
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for a while (e.g. after a 429 with Retry-After).
+
+        Args:
+            seconds: Pause duration
+        """
+        if seconds <= 0:
+            return
+        # Refilling restarts when the pause ends, so no burst is released at once
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and wait-time statistics."""
+        return {
+            "rate_per_minute": self.rate_per_minute,
+            "capacity": self.capacity,
+            "queue_depth": self.waiting,
+            "acquired": self.acquired,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 3) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "paused_remaining": round(max(0.0, self._paused_until - time.monotonic()), 3),
+        }
+
+class RateLimiterRegistry:
+    """Named token buckets for upstreams and tools."""
+
+    def __init__(self, default_per_minute: float, limits: Optional[Dict[str, float]] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            default_per_minute: Rate for buckets without an explicit limit
+            limits: Per-name rates; a name matches exactly or by its prefix before ":"
+        """
+        self.default_per_minute = default_per_minute
+        self.limits = limits or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def get(self, name: str) -> TokenBucket:
+        """
+        Get (or create) the bucket for a name such as ``"rpc:<url>"`` or ``"tool:get_balance"``.
+
+        Args:
+            name: Bucket name
+
+        Returns:
+            TokenBucket: The bucket
+        """
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            rate = self.limits.get(name, self.limits.get(name.split(":", 1)[0], self.default_per_minute))
+            bucket = TokenBucket(rate)
+            self._buckets[name] = bucket
+        return bucket
+
+    async def acquire(self, name: str):
+        """Wait for a token from a named bucket."""
+        await self.get(name).acquire()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return statistics for every bucket in use."""
+        return {name: bucket.stats() for name, bucket in self._buckets.items()}
@@ -0,0 +1,86 @@
+"""
+Tool response encoding for the Solana MCP Server.
+
+Results are serialized once, as compact JSON unless pretty output is
+requested, using orjson when it is installed. Optionally the result is
+also returned as MCP structured content, so clients that read
+``structuredContent`` get the data without parsing the text.
+"""
+
+import json
+from typing import Any, Dict, List, Tuple, Union
+
+from mcp.types import TextContent
+
+from utils import is_orjson_available
+
+# Per-call override of the configured output format, accepted by every tool
+PRETTY_PROPERTY = {
+    "type": "boolean",
+    "description": "Pretty-print the JSON result (compact by default)"
+}
+
+ToolResponse = Union[List[TextContent], Tuple[List[TextContent], Dict[str, Any]]]
+
+class ResponseEncoder:
+    """Serializes tool results to MCP content."""
+
+    def __init__(self, pretty: bool = False, structured: bool = False):
+        """
+        Initialize the encoder.
+
+        Args:
+            pretty: Indent JSON output by default
+            structured: Also return results as structured content
+        """
+        self.pretty = pretty
+        self.structured = structured
+        self._orjson = None
+        if is_orjson_available():
+            import orjson
+            self._orjson = orjson
+
+    @property
+    def backend(self) -> str:
+        """Name of the JSON library in use."""
+        return "orjson" if self._orjson is not None else "json"
+
+    def dumps(self, value: Any, pretty: bool = False) -> str:
+        """
+        Serialize a value to JSON.
+
+        Args:
+            value: JSON-serializable value
+            pretty: Indent the output
+
+        Returns:
+            str: JSON text
+        """
+        if self._orjson is not None:
+            options = self._orjson.OPT_NON_STR_KEYS
+            if pretty:
+                options |= self._orjson.OPT_INDENT_2
+            try:
+                return self._orjson.dumps(value, option=options).decode("utf-8")
+            except TypeError:
+                # Values orjson rejects (e.g. integers beyond 64 bits) go through json
+                pass
+        if pretty:
+            return json.dumps(value, indent=2)
+        return json.dumps(value, separators=(",", ":"))
+
+    def encode(self, result: Any, arguments: Dict[str, Any]) -> ToolResponse:
+        """
+        Build a tool response.
+
+        Args:
+            result: Tool result
+            arguments: Tool call arguments (``pretty`` overrides the default format)
+
+        Returns:
+            ToolResponse: Text content, plus the result as structured content if enabled
+        """
+        content = [TextContent(type="text", text=self.dumps(result, arguments.get("pretty", self.pretty)))]
+        if self.structured and isinstance(result, dict):
+            return content, result
+        return content
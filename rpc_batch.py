@@ -0,0 +1,171 @@
+"""
+JSON-RPC micro-batching for the Solana MCP Server.
+
+Requests issued within a short window are coalesced into a single
+JSON-RPC batch array and the responses are routed back to the waiting
+callers by request id.
+"""
+
+import asyncio
+import itertools
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Methods with side effects are never sent twice (not hedged, not shared between callers)
+NON_IDEMPOTENT_METHODS = {"sendTransaction", "requestAirdrop"}
+
+class RPCError(Exception):
+    """Error object returned by a JSON-RPC endpoint."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+def unwrap_response(response: Dict[str, Any]) -> Any:
+    """
+    Extract the result from a JSON-RPC response object.
+
+    Args:
+        response: Decoded JSON-RPC response
+
+    Returns:
+        Any: The ``result`` member
+
+    Raises:
+        RPCError: If the response carries an ``error`` member
+    """
+    if "error" in response:
+        error = response["error"] or {}
+        raise RPCError(error.get("code", -1), error.get("message", "Unknown error"), error.get("data"))
+    return response.get("result")
+
+# Sends a single request object or a batch array (optionally hedged) and returns the decoded JSON body
+PostFunc = Callable[..., Awaitable[Any]]
+
+class JSONRPCBatcher:
+    """Coalesces concurrent JSON-RPC calls into batch requests."""
+
+    def __init__(self, post: PostFunc, window: float = 0.003, max_batch_size: int = 100):
+        """
+        Initialize the batcher.
+
+        Args:
+            post: Coroutine that sends a JSON-RPC payload and returns the decoded body
+            window: Seconds to wait for more calls before flushing (0 disables batching)
+            max_batch_size: Flush immediately once this many calls are pending
+        """
+        self._post = post
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._ids = itertools.count(1)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._pending_hedge = False
+        self._pending_idempotent = True
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+        self.requests = 0
+        self.batches = 0
+        self.http_requests = 0
+
+    async def request(self, method: str, params: Optional[list] = None, hedge: bool = False) -> Any:
+        """
+        Send a JSON-RPC call, possibly as part of a batch.
+
+        Args:
+            method: RPC method name
+            params: RPC parameters
+            hedge: Allow a hedged request (a batch is hedged if any of its calls are,
+                unless it contains a non-idempotent call)
+
+        Returns:
+            Any: The call's ``result``
+        """
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []}
+        self.requests += 1
+        idempotent = method not in NON_IDEMPOTENT_METHODS
+        hedge = hedge and idempotent
+
+        if self.window <= 0:
+            self.http_requests += 1
+            return unwrap_response(await self._post(payload, hedge=hedge))
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, future))
+        self._pending_hedge = self._pending_hedge or hedge
+        self._pending_idempotent = self._pending_idempotent and idempotent
+
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._schedule_flush)
+
+        return await future
+
+    def _schedule_flush(self):
+        """Hand the pending calls to a flush task."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        hedge, self._pending_hedge = self._pending_hedge, False
+        idempotent, self._pending_idempotent = self._pending_idempotent, True
+        # A hedged batch reaches two endpoints, so it must not carry side effects
+        hedge = hedge and idempotent
+        if not pending:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._flush(pending, hedge))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, pending: List[Tuple[Dict[str, Any], asyncio.Future]], hedge: bool = False):
+        """Send pending calls and resolve their futures."""
+        self.http_requests += 1
+        try:
+            if len(pending) == 1:
+                payload, future = pending[0]
+                body = await self._post(payload, hedge=hedge)
+                responses = [body]
+            else:
+                self.batches += 1
+                body = await self._post([payload for payload, _ in pending], hedge=hedge)
+                if not isinstance(body, list):
+                    # Whole-batch failure (e.g. provider rejects batching)
+                    unwrap_response(body)
+                    raise RPCError(-32603, "Malformed batch response")
+                responses = body
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_id = {response.get("id"): response for response in responses if isinstance(response, dict)}
+        for payload, future in pending:
+            if future.done():
+                continue
+            response = by_id.get(payload["id"])
+            if response is None:
+                future.set_exception(RPCError(-32603, f"Missing response for {payload['method']}"))
+                continue
+            try:
+                future.set_result(unwrap_response(response))
+            except RPCError as e:
+                future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request and batching counters."""
+        return {
+            "window_ms": self.window * 1000,
+            "requests": self.requests,
+            "batches": self.batches,
+            "http_requests": self.http_requests,
+            "pending": len(self._pending),
+        }
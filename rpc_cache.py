@@ -0,0 +1,216 @@
+"""
+Slot-aware response cache for the Solana MCP Server.
+
+RPC results are cached per (method, params, commitment). Each entry
+remembers the ``context.slot`` it was read at and expires either after a
+wall-clock TTL or once the network has advanced too many slots past it,
+whichever comes first. Less final commitment levels get shorter lifetimes.
+Slot age is measured against the latest slot seen at the entry's own
+commitment level, because processed and confirmed slots run tens of
+slots ahead of finalized ones. Entries kept current by a subscription
+are pinned and never expire until they are unpinned.
+"""
+
+import json
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from config import SLOT_DURATION, config as app_config
+
+@dataclass
+class CacheEntry:
+    """A cached RPC result."""
+    value: Any
+    slot: Optional[int]
+    commitment: str
+    expires_at: float
+    max_slot_age: int
+
+def make_key(method: str, params: Any, commitment: str) -> Tuple[str, str, str]:
+    """
+    Build a cache key for an RPC call.
+
+    Args:
+        method: RPC method name
+        params: RPC parameters (must be JSON-serializable)
+        commitment: Commitment level
+
+    Returns:
+        Tuple: Hashable cache key
+    """
+    return (method, json.dumps(params, sort_keys=True, separators=(",", ":")), commitment)
+
+def params_commitment(params: Any) -> str:
+    """Commitment requested in RPC parameters (the RPC default is finalized)."""
+    if isinstance(params, list) and params and isinstance(params[-1], dict):
+        return params[-1].get("commitment", "finalized")
+    return "finalized"
+
+def response_slot(value: Any) -> Optional[int]:
+    """Extract ``context.slot`` from an RPC result, if present."""
+    if isinstance(value, dict):
+        context = value.get("context")
+        if isinstance(context, dict):
+            return context.get("slot")
+    return None
+
+class SlotCache:
+    """Bounded LRU cache whose entries expire by slot age or TTL."""
+
+    def __init__(self, max_entries: int = 10_000, ttls: Optional[Dict[str, float]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+            ttls: Wall-clock TTL in seconds per commitment level (default: the RPC_CACHE_TTL_* settings)
+        """
+        self.max_entries = max_entries
+        self.ttls = {**app_config.rpc_cache_ttls, **(ttls or {})}
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._pinned: Dict[Hashable, CacheEntry] = {}
+        self.latest_slots: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.pinned_hits = 0
+
+    def observe_slot(self, slot: Optional[int], commitment: str):
+        """
+        Record a slot seen in an RPC response or notification.
+
+        Args:
+            slot: Observed slot
+            commitment: Commitment level the slot was observed at
+        """
+        if slot is not None and slot > self.latest_slots.get(commitment, 0):
+            self.latest_slots[commitment] = slot
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            Optional[Any]: Cached value, or None on miss or expiry
+        """
+        pinned = self._pinned.get(key)
+        if pinned is not None:
+            self.hits += 1
+            self.pinned_hits += 1
+            return pinned.value
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if self._is_expired(entry):
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def put(self, key: Hashable, value: Any, commitment: str, slot: Optional[int] = None):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key (see make_key)
+            value: RPC result to cache
+            commitment: Commitment level the value was read at
+            slot: Slot the value was read at (defaults to the result's context.slot)
+        """
+        if slot is None:
+            slot = response_slot(value)
+        self.observe_slot(slot, commitment)
+
+        ttl = self.ttls.get(commitment, self.ttls["confirmed"])
+        if ttl <= 0:
+            return
+
+        self._entries[key] = CacheEntry(
+            value=value,
+            slot=slot,
+            commitment=commitment,
+            expires_at=time.monotonic() + ttl,
+            max_slot_age=max(1, math.ceil(ttl / SLOT_DURATION)),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pin(self, key: Hashable, value: Any, commitment: str, slot: Optional[int] = None) -> bool:
+        """
+        Store a value that stays valid until it is unpinned or replaced.
+
+        Used for accounts whose changes are pushed by a subscription. A
+        value read at an older slot than the pinned one is ignored.
+
+        Args:
+            key: Cache key (see make_key)
+            value: RPC result to cache
+            commitment: Commitment level the value was read at
+            slot: Slot the value was read at (defaults to the result's context.slot)
+
+        Returns:
+            bool: True if the value was stored
+        """
+        if slot is None:
+            slot = response_slot(value)
+        self.observe_slot(slot, commitment)
+
+        current = self._pinned.get(key)
+        if current is not None and slot is not None and current.slot is not None and slot < current.slot:
+            return False
+        self._pinned[key] = CacheEntry(value=value, slot=slot, commitment=commitment, expires_at=math.inf, max_slot_age=0)
+        self._entries.pop(key, None)
+        return True
+
+    def unpin(self, key: Hashable):
+        """Stop serving a pinned value (later reads go back to the RPC)."""
+        self._pinned.pop(key, None)
+
+    def invalidate(self, key: Hashable):
+        """Remove an entry if present."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all unpinned entries."""
+        self._entries.clear()
+
+    def _is_expired(self, entry: CacheEntry) -> bool:
+        """Check whether an entry is past its TTL or slot age."""
+        if time.monotonic() >= entry.expires_at:
+            return True
+        if entry.slot is not None and self.latest_slots.get(entry.commitment, 0) - entry.slot > entry.max_slot_age:
+            return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "pinned": len(self._pinned),
+            "max_entries": self.max_entries,
+            "latest_slots": dict(self.latest_slots),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "pinned_hits": self.pinned_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,576 @@
+"""
+Pooled Solana RPC clients for the Solana MCP Server.
+
+Keeps one warm, keep-alive HTTP session per configured network so that
+tool calls against mainnet, devnet and testnet can share connections
+instead of paying a TCP/TLS handshake on every request. Watched accounts
+are kept current in the cache by a WebSocket subscription instead of
+being polled.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from account_loader import AccountLoader
+from config import Config, NetworkConfig
+from http_session import ssl_context
+from rpc_batch import NON_IDEMPOTENT_METHODS, JSONRPCBatcher, unwrap_response
+from rpc_cache import SlotCache, make_key, params_commitment, response_slot
+from rate_limiter import RateLimiterRegistry
+from rpc_router import RPCRouter
+from single_flight import SingleFlight, request_key
+from utils import is_http2_available
+from ws_subscriptions import SubscriptionHandle, SubscriptionManager
+
+if TYPE_CHECKING:
+    from solana.rpc.async_api import AsyncClient
+    from solana.rpc.commitment import Commitment
+
+logger = logging.getLogger(__name__)
+
+class NetworkClientPool:
+    """Connection pool for a single Solana network."""
+
+    def __init__(
+        self,
+        network: NetworkConfig,
+        commitment: "Commitment",
+        size: int = 8,
+        timeout: float = 10.0,
+        keepalive_expiry: float = 60.0,
+        batch_window: float = 0.003,
+        batch_max_size: int = 100,
+        cache_size: int = 10_000,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        endpoint_cooldown: float = 5.0,
+        max_slot_lag: int = 10,
+        health_interval: float = 10.0,
+        hedge_budget: float = 0.1,
+        hedge_delay: float = 0.5,
+        limiter: Optional[RateLimiterRegistry] = None,
+        max_concurrent_chunks: int = 8,
+        ws_subscriptions: bool = True,
+        ws_reconnect_max_delay: float = 30.0,
+        ws_ping_interval: float = 20.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            network: Network configuration to connect to
+            commitment: Default commitment level for RPC calls
+            size: Maximum number of concurrent keep-alive connections
+            timeout: Request timeout in seconds
+            keepalive_expiry: Seconds an idle connection is kept open
+            batch_window: Seconds to collect JSON-RPC calls into one batch
+            batch_max_size: Maximum number of calls per batch
+            cache_size: Maximum number of cached RPC results
+            cache_ttls: Cache TTL in seconds per commitment level
+            endpoint_cooldown: Base seconds a failing endpoint is skipped
+            max_slot_lag: Slots an endpoint may lag before it is considered unhealthy
+            health_interval: Seconds between endpoint health probes (0 disables)
+            hedge_budget: Maximum fraction of hedge-eligible requests that may be hedged
+            hedge_delay: Hedge delay in seconds until an endpoint has enough latency samples
+            limiter: Rate limiters applied per RPC endpoint
+            max_concurrent_chunks: getMultipleAccounts chunks fetched in parallel for bulk lookups
+            ws_subscriptions: Allow watching accounts over the network's WebSocket URL
+            ws_reconnect_max_delay: Upper bound in seconds for the WebSocket reconnect delay
+            ws_ping_interval: Seconds between WebSocket keep-alive pings
+            transport: HTTP transport replacing the network one (e.g. ``httpx.MockTransport`` in tests)
+        """
+        self.network = network
+        self.commitment = commitment
+        self.size = size
+        self.http2 = is_http2_available()
+        self.session = httpx.AsyncClient(
+            verify=ssl_context(),
+            http2=self.http2,
+            timeout=timeout,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=size,
+                max_keepalive_connections=size,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        self.router = RPCRouter(
+            self.session,
+            network.rpc_urls,
+            cooldown=endpoint_cooldown,
+            max_slot_lag=max_slot_lag,
+            health_interval=health_interval,
+            hedge_budget=hedge_budget,
+            hedge_delay=hedge_delay,
+            limiter=limiter,
+            commitment=commitment,
+        )
+        self.timeout = timeout
+        self._client: Optional["AsyncClient"] = None
+
+        self._slots = asyncio.Semaphore(size)
+        self._in_use = 0
+        self._waiting = 0
+        self._acquired = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        
+        self.batcher = JSONRPCBatcher(self.post, window=batch_window, max_batch_size=batch_max_size)
+        self.accounts = AccountLoader(
+            self.request,
+            window=batch_window,
+            max_concurrency=max_concurrent_chunks,
+            bulk_request=self.request_unbatched,
+        )
+        self.cache = SlotCache(max_entries=cache_size, ttls=cache_ttls)
+        self.flights = SingleFlight()
+
+        self.subscriptions: Optional[SubscriptionManager] = None
+        if ws_subscriptions and network.ws_url:
+            self.subscriptions = SubscriptionManager(
+                network.ws_url, max_reconnect_delay=ws_reconnect_max_delay, ping_interval=ws_ping_interval
+            )
+        self._watches: Dict[str, List[Tuple[SubscriptionHandle, SubscriptionHandle]]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def client(self) -> "AsyncClient":
+        """solana-py client for the network (created on first use)."""
+        if self._client is None:
+            from solana.rpc.async_api import AsyncClient
+
+            self._client = AsyncClient(self.network.rpc_url, commitment=self.commitment, timeout=self.timeout)
+            # Share the tuned session instead of the provider's default one
+            self._client._provider.session = self.session
+        return self._client
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator["AsyncClient"]:
+        """Borrow the network client, waiting for a free connection slot."""
+        started = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        waited = time.perf_counter() - started
+        self._acquired += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        self._in_use += 1
+        try:
+            yield self.client
+        finally:
+            self._in_use -= 1
+            self._slots.release()
+
+    async def post(self, payload: Any, hedge: bool = False) -> Any:
+        """
+        Send a raw JSON-RPC payload over a pooled connection.
+
+        The payload goes to the healthiest endpoint of the network and
+        fails over to the others on timeouts, 429s and server errors.
+
+        Args:
+            payload: Request object or batch array
+            hedge: Allow a hedged request to a second endpoint
+
+        Returns:
+            Any: Decoded JSON response body
+        """
+        async with self.acquire():
+            return await self.router.post(payload, hedge=hedge)
+
+    async def request(self, method: str, params: Optional[list] = None, hedge: bool = False) -> Any:
+        """
+        Make a JSON-RPC call through the batcher.
+
+        Identical read calls already in flight share a single request.
+
+        Args:
+            method: RPC method name (e.g. "getBalance")
+            params: RPC parameters
+            hedge: Allow a hedged request (ignored for non-idempotent methods)
+
+        Returns:
+            Any: The call's ``result``
+        """
+        if method in NON_IDEMPOTENT_METHODS:
+            return await self._send(method, params)
+        return await self.flights.do(request_key(method, params), lambda: self._send(method, params, hedge))
+
+    async def request_unbatched(self, method: str, params: Optional[list] = None, hedge: bool = False) -> Any:
+        """
+        Make a JSON-RPC call as its own HTTP request, bypassing the batcher.
+
+        Used for calls that are already large (bulk getMultipleAccounts
+        chunks), so that concurrent calls become parallel HTTP requests
+        bounded by the pool size instead of one batch POST.
+
+        Args:
+            method: RPC method name
+            params: RPC parameters
+            hedge: Allow a hedged request (ignored for non-idempotent methods)
+
+        Returns:
+            Any: The call's ``result``
+        """
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []}
+        body = await self.post(payload, hedge=hedge and method not in NON_IDEMPOTENT_METHODS)
+        result = unwrap_response(body)
+        self.cache.observe_slot(response_slot(result), params_commitment(params))
+        return result
+
+    async def _send(self, method: str, params: Optional[list], hedge: bool = False) -> Any:
+        """Send a call through the batcher and record the observed slot."""
+        result = await self.batcher.request(method, params, hedge=hedge)
+        self.cache.observe_slot(response_slot(result), params_commitment(params))
+        return result
+
+    async def cached_request(self, method: str, params: list, commitment: str, hedge: bool = False) -> Any:
+        """
+        Make a JSON-RPC call, serving repeated reads from the slot cache.
+
+        Args:
+            method: RPC method name
+            params: RPC parameters (including the commitment config)
+            commitment: Commitment level used for the cache lifetime
+            hedge: Allow a hedged request on a cache miss
+
+        Returns:
+            Any: The call's ``result``
+        """
+        key = make_key(method, params, commitment)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = await self.request(method, params, hedge=hedge)
+        self.cache.put(key, result, commitment)
+        return result
+
+    async def get_account(self, address: str, commitment: str, hedge: bool = False) -> Dict[str, Any]:
+        """
+        Load an account through the cache and getMultipleAccounts fan-in.
+
+        Args:
+            address: Base58 account address
+            commitment: Commitment level
+            hedge: Allow a hedged request on a cache miss
+
+        Returns:
+            Dict: ``{"context": {"slot": ...}, "value": account or None}``
+        """
+        key = make_key("getAccountInfo", [address], commitment)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = await self.flights.do(key, lambda: self.accounts.load(address, commitment, hedge))
+        self.cache.put(key, response, commitment)
+        return response
+
+    async def get_accounts(self, addresses: List[str], commitment: str, hedge: bool = False) -> List[Dict[str, Any]]:
+        """
+        Load many accounts, fetching only those missing from the cache.
+
+        Args:
+            addresses: Base58 account addresses
+            commitment: Commitment level
+            hedge: Allow hedged requests for cache misses
+
+        Returns:
+            List[Dict]: One ``{"context", "value"}`` entry per input address, in order
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for address in dict.fromkeys(addresses):
+            cached = self.cache.get(make_key("getAccountInfo", [address], commitment))
+            if cached is not None:
+                found[address] = cached
+            else:
+                missing.append(address)
+
+        if missing:
+            responses = await self.accounts.load_many(missing, commitment, hedge)
+            for address, response in zip(missing, responses):
+                self.cache.put(make_key("getAccountInfo", [address], commitment), response, commitment)
+                found[address] = response
+
+        return [found[address] for address in addresses]
+
+    async def get_lamports(self, addresses: List[str], commitment: str, hedge: bool = False) -> Dict[str, Any]:
+        """
+        Get balances for many accounts without transferring their data.
+
+        Cached accounts are answered locally; the rest are fetched with
+        zero-length data slices in bounded-concurrency getMultipleAccounts chunks.
+
+        Args:
+            addresses: Base58 account addresses
+            commitment: Commitment level
+            hedge: Allow hedged requests
+
+        Returns:
+            Dict: ``{"slot": ..., "lamports": [int or None per address]}`` (None if the account does not exist)
+        """
+        lamports: Dict[str, Optional[int]] = {}
+        missing = []
+        slot = None
+        for address in dict.fromkeys(addresses):
+            cached = self.cache.get(make_key("getAccountInfo", [address], commitment))
+            if cached is not None:
+                account = cached.get("value")
+                lamports[address] = account["lamports"] if account else None
+                slot = max(slot or 0, response_slot(cached) or 0)
+            else:
+                missing.append(address)
+
+        if missing:
+            responses = await self.accounts.load_many(
+                missing, commitment, hedge, data_slice={"offset": 0, "length": 0}
+            )
+            for address, response in zip(missing, responses):
+                account = response.get("value")
+                lamports[address] = account["lamports"] if account else None
+                slot = max(slot or 0, response_slot(response) or 0)
+
+        return {"slot": slot, "lamports": [lamports[address] for address in addresses]}
+
+    async def watch_account(self, address: str) -> bool:
+        """
+        Keep an account current in the cache through an account subscription.
+
+        While the subscription is active, reads of the account (including
+        balance lookups) are answered from the cache. Watches are
+        reference-counted; each call needs a matching ``unwatch_account``.
+
+        Args:
+            address: Base58 account address
+
+        Returns:
+            bool: False if WebSocket subscriptions are unavailable for the network
+        """
+        if self.subscriptions is None:
+            return False
+
+        key = make_key("getAccountInfo", [address], self.commitment)
+
+        def on_state(active: bool):
+            if active:
+                # Notifications only report changes, so load the current state once
+                self._spawn(self._load_watched(address, key))
+            else:
+                self.cache.unpin(key)
+
+        account = await self.subscriptions.subscribe(
+            "accountSubscribe",
+            [address, {"encoding": "base64", "commitment": self.commitment}],
+            on_notification=lambda result: self.cache.pin(key, result, self.commitment),
+            on_state=on_state,
+        )
+        slot = await self.subscriptions.subscribe("slotSubscribe", [], on_notification=self._observe_slot_notification)
+        self._watches.setdefault(address, []).append((account, slot))
+        return True
+
+    async def unwatch_account(self, address: str) -> bool:
+        """
+        Release a watch taken with ``watch_account``.
+
+        Args:
+            address: Base58 account address
+
+        Returns:
+            bool: False if the account was not watched
+        """
+        watches = self._watches.get(address)
+        if not watches:
+            return False
+
+        account, slot = watches.pop()
+        if not watches:
+            del self._watches[address]
+            self.cache.unpin(make_key("getAccountInfo", [address], self.commitment))
+        await self.subscriptions.unsubscribe(account)
+        await self.subscriptions.unsubscribe(slot)
+        return True
+
+    def watched_accounts(self) -> Dict[str, int]:
+        """Return the watch count per watched address."""
+        return {address: len(watches) for address, watches in self._watches.items()}
+
+    def _is_watch_active(self, address: str) -> bool:
+        """Check whether an address is watched by an active subscription."""
+        watches = self._watches.get(address)
+        return bool(watches) and watches[0][0].subscription.active
+
+    async def _load_watched(self, address: str, key: Any):
+        """Pin the current state of a newly subscribed account."""
+        try:
+            response = await self.flights.do(key, lambda: self.accounts.load(address, self.commitment))
+        except Exception as e:
+            logger.warning(f"Failed to load watched account {address}: {e}")
+            return
+        if self._is_watch_active(address):
+            self.cache.pin(key, response, self.commitment)
+
+    def _observe_slot_notification(self, result: Dict[str, Any]):
+        """Record the processed slot and rooted (finalized) slot of a slotSubscribe notification."""
+        self.cache.observe_slot(result.get("slot"), "processed")
+        self.cache.observe_slot(result.get("root"), "finalized")
+
+    def _spawn(self, coro):
+        """Run a background task owned by the pool."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return occupancy and wait-time statistics."""
+        return {
+            "rpc_url": self.network.rpc_url,
+            "http2": self.http2,
+            "size": self.size,
+            "in_use": self._in_use,
+            "waiting": self._waiting,
+            "acquired": self._acquired,
+            "avg_wait_ms": round(self._total_wait / self._acquired * 1000, 3) if self._acquired else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 3),
+            "batching": self.batcher.stats(),
+            "account_fan_in": self.accounts.stats(),
+            "cache": self.cache.stats(),
+            "single_flight": self.flights.stats(),
+            "failovers": self.router.failovers,
+            "hedging": self.router.hedge_stats(),
+            "endpoints": self.router.health(),
+            "subscriptions": self.subscriptions.stats() if self.subscriptions is not None else None,
+        }
+
+    async def close(self):
+        """Close all pooled connections."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self.subscriptions is not None:
+            await self.subscriptions.close()
+        await self.router.close()
+        await self.session.aclose()
+
+class RPCClientPool:
+    """Per-network registry of pooled RPC clients."""
+
+    def __init__(
+        self,
+        config: Config,
+        commitment: Optional["Commitment"] = None,
+        limiter: Optional[RateLimiterRegistry] = None,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            config: Server configuration describing the available networks
+            commitment: Default commitment (defaults to config.commitment)
+            limiter: Rate limiters applied per RPC endpoint
+        """
+        self.config = config
+        self.commitment = commitment or config.commitment
+        self.limiter = limiter
+        self._pools: Dict[str, NetworkClientPool] = {}
+
+    def get(self, network: Optional[str] = None) -> NetworkClientPool:
+        """
+        Get (or lazily create) the pool for a network.
+
+        Args:
+            network: Network name (defaults to current network)
+
+        Returns:
+            NetworkClientPool: Pool for the network
+        """
+        name = network or self.config.current_network
+        pool = self._pools.get(name)
+        if pool is None:
+            if name not in self.config.networks:
+                raise ValueError(f"Unknown network: {name}")
+            pool = NetworkClientPool(
+                self.config.networks[name],
+                self.commitment,
+                size=self.config.rpc_pool_size,
+                timeout=self.config.rpc_timeout,
+                keepalive_expiry=self.config.rpc_keepalive_expiry,
+                batch_window=self.config.rpc_batch_window_ms / 1000,
+                batch_max_size=self.config.rpc_batch_max_size,
+                cache_size=self.config.rpc_cache_size,
+                cache_ttls=self.config.rpc_cache_ttls,
+                endpoint_cooldown=self.config.rpc_endpoint_cooldown,
+                max_slot_lag=self.config.rpc_max_slot_lag,
+                health_interval=self.config.rpc_health_interval,
+                hedge_budget=self.config.rpc_hedge_budget,
+                hedge_delay=self.config.rpc_hedge_delay_ms / 1000,
+                limiter=self.limiter,
+                max_concurrent_chunks=self.config.rpc_max_concurrent_chunks,
+                ws_subscriptions=self.config.ws_subscriptions,
+                ws_reconnect_max_delay=self.config.ws_reconnect_max_delay,
+                ws_ping_interval=self.config.ws_ping_interval,
+            )
+            self._pools[name] = pool
+            logger.info(f"Opened RPC pool for {name} ({pool.size} connections, {len(pool.router.endpoints)} endpoints)")
+        return pool
+
+    def client(self, network: Optional[str] = None):
+        """
+        Borrow a client for a network.
+
+        Usage:
+            async with pool.client("devnet") as client:
+                await client.get_balance(pubkey)
+        """
+        return self.get(network).acquire()
+
+    async def request(
+        self,
+        method: str,
+        params: Optional[list] = None,
+        network: Optional[str] = None,
+        hedge: bool = False,
+    ) -> Any:
+        """
+        Make a JSON-RPC call on a network.
+
+        Args:
+            method: RPC method name
+            params: RPC parameters
+            network: Network name (defaults to current network)
+            hedge: Allow a hedged request
+
+        Returns:
+            Any: The call's ``result``
+        """
+        return await self.get(network).request(method, params, hedge=hedge)
+
+    def health(self, network: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get endpoint health scores for a network.
+
+        Args:
+            network: Network name (defaults to current network)
+
+        Returns:
+            List[Dict]: Endpoint health in routing order
+        """
+        return self.get(network).router.health()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return statistics for every open network pool."""
+        return {name: pool.stats() for name, pool in self._pools.items()}
+
+    async def close(self):
+        """Close every open network pool."""
+        pools, self._pools = list(self._pools.values()), {}
+        await asyncio.gather(*(pool.close() for pool in pools), return_exceptions=True)
@@ -0,0 +1,406 @@
+"""
+Multi-endpoint RPC routing for the Solana MCP Server.
+
+Tracks latency (EWMA), error rate and slot lag for every RPC endpoint of
+a network, sends each request to the best healthy endpoint and fails
+over to the next one on timeouts, transport errors, 429s and 5xx
+responses.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from config import SLOT_DURATION
+from rate_limiter import RateLimiterRegistry
+
+logger = logging.getLogger(__name__)
+
+# Approximate Solana slot duration in milliseconds, used to price slot lag
+SLOT_MS = SLOT_DURATION * 1000
+
+# Longest cooldown applied after repeated failures, in seconds
+MAX_COOLDOWN = 60.0
+
+# Latency assumed for endpoints that have failed without ever succeeding
+FAILED_LATENCY_MS = 1000.0
+
+# Latency samples kept per endpoint, and the minimum needed to trust its p95
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+# Errors that move a request on to another endpoint
+FAILOVER_ERRORS = (httpx.TimeoutException, httpx.TransportError)
+
+# Extra rounds over all endpoints when every one of them rate limited us
+RATE_LIMIT_RETRIES = 2
+
+class EndpointUnavailable(Exception):
+    """Raised for responses that should trigger failover (429 / 5xx)."""
+
+    def __init__(self, url: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(f"{url} returned HTTP {status_code}")
+        self.url = url
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given in seconds."""
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+def body_slot(body: Any) -> Optional[int]:
+    """Extract the highest ``context.slot`` from a JSON-RPC response or batch."""
+    items = body if isinstance(body, list) else [body]
+    slots = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        result = item.get("result")
+        if isinstance(result, dict) and isinstance(result.get("context"), dict):
+            slot = result["context"].get("slot")
+            if isinstance(slot, int):
+                slots.append(slot)
+    return max(slots) if slots else None
+
+@dataclass
+class EndpointHealth:
+    """Health statistics for one RPC endpoint."""
+    url: str
+    latency_ms: Optional[float] = None
+    error_rate: float = 0.0
+    last_slot: Optional[int] = None
+    slot_lag: int = 0
+    requests: int = 0
+    errors: int = 0
+    consecutive_failures: int = 0
+    cooldown_until: float = 0.0
+    samples: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW), repr=False)
+
+    def p95_ms(self) -> Optional[float]:
+        """95th percentile of recent latencies, once enough samples exist."""
+        if len(self.samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def score(self) -> float:
+        """Routing score in milliseconds; lower is better."""
+        if self.latency_ms is not None:
+            latency = self.latency_ms
+        else:
+            # Untried endpoints score zero so they are explored once
+            latency = FAILED_LATENCY_MS if self.errors else 0.0
+        return latency * (1 + 10 * self.error_rate) + self.slot_lag * SLOT_MS
+
+class RPCRouter:
+    """Routes JSON-RPC payloads across the endpoints of one network."""
+
+    def __init__(
+        self,
+        session: httpx.AsyncClient,
+        urls: List[str],
+        alpha: float = 0.2,
+        cooldown: float = 5.0,
+        max_slot_lag: int = 10,
+        health_interval: float = 10.0,
+        hedge_budget: float = 0.1,
+        hedge_delay: float = 0.5,
+        limiter: Optional[RateLimiterRegistry] = None,
+        commitment: str = "confirmed",
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            session: Pooled HTTP session used for all endpoints
+            urls: RPC endpoint URLs (the first is the primary)
+            alpha: EWMA smoothing factor for latency and error rate
+            cooldown: Base seconds an endpoint is skipped after a failure
+            max_slot_lag: Endpoints further behind than this are treated as unhealthy
+            health_interval: Seconds between background getSlot probes (0 disables)
+            hedge_budget: Maximum fraction of hedge-eligible requests that may be hedged
+            hedge_delay: Hedge delay in seconds until the primary has enough latency samples
+            limiter: Rate limiters; each endpoint uses the ``rpc:<url>`` bucket
+            commitment: Commitment level of the getSlot probes
+        """
+        if not urls:
+            raise ValueError("At least one RPC endpoint is required")
+        self.session = session
+        self.endpoints = [EndpointHealth(url) for url in urls]
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.max_slot_lag = max_slot_lag
+        self.health_interval = health_interval
+        self.hedge_budget = hedge_budget
+        self.hedge_delay = hedge_delay
+        self.limiter = limiter
+        self.commitment = commitment
+        self.failovers = 0
+        self.hedge_eligible = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def is_healthy(self, endpoint: EndpointHealth, now: Optional[float] = None) -> bool:
+        """Check whether an endpoint is outside its cooldown and not lagging."""
+        now = now if now is not None else time.monotonic()
+        return endpoint.cooldown_until <= now and endpoint.slot_lag <= self.max_slot_lag
+
+    def ranked(self) -> List[EndpointHealth]:
+        """Endpoints in routing order: healthy by score, then unhealthy by cooldown expiry."""
+        now = time.monotonic()
+        healthy = [e for e in self.endpoints if self.is_healthy(e, now)]
+        unhealthy = [e for e in self.endpoints if not self.is_healthy(e, now)]
+        healthy.sort(key=lambda e: e.score())
+        unhealthy.sort(key=lambda e: e.cooldown_until)
+        return healthy + unhealthy
+
+    async def post(self, payload: Any, hedge: bool = False) -> Any:
+        """
+        Send a payload to the best endpoint, failing over on errors.
+
+        Args:
+            payload: JSON-RPC request object or batch array
+            hedge: Allow a hedged request to the second-best endpoint
+
+        Returns:
+            Any: Decoded JSON response body
+        """
+        self._ensure_probe()
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            try:
+                return await self._post_once(payload, hedge)
+            except EndpointUnavailable as e:
+                # Every endpoint answered 429: queue behind the paused rate limiters and retry
+                if e.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                    raise
+
+    async def _post_once(self, payload: Any, hedge: bool) -> Any:
+        """Try each endpoint once in routing order."""
+        ranked = self.ranked()
+        last_error: Optional[Exception] = None
+
+        if hedge:
+            self.hedge_eligible += 1
+            if len(ranked) > 1 and self.is_healthy(ranked[1]) and self.hedges < self.hedge_budget * self.hedge_eligible:
+                try:
+                    return await self._post_hedged(ranked[0], ranked[1], payload)
+                except (*FAILOVER_ERRORS, EndpointUnavailable) as e:
+                    last_error = e
+                    ranked = ranked[2:]
+
+        for endpoint in ranked:
+            if last_error is not None:
+                self.failovers += 1
+                logger.warning(f"Failing over to {endpoint.url}: {last_error}")
+            try:
+                return await self.post_to(endpoint, payload)
+            except (*FAILOVER_ERRORS, EndpointUnavailable) as e:
+                last_error = e
+        raise last_error
+
+    def hedge_delay_for(self, endpoint: EndpointHealth) -> float:
+        """Seconds to wait on an endpoint before hedging: its observed p95."""
+        p95 = endpoint.p95_ms()
+        return p95 / 1000 if p95 is not None else self.hedge_delay
+
+    async def _post_hedged(self, primary: EndpointHealth, secondary: EndpointHealth, payload: Any) -> Any:
+        """
+        Send to the primary and, if it is slower than its p95, also to the secondary.
+
+        The first successful response wins and the other request is cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        primary_task = loop.create_task(self.post_to(primary, payload))
+        tasks = {primary_task}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay_for(primary))
+            if done:
+                error = primary_task.exception()
+                if error is None:
+                    return primary_task.result()
+                if not isinstance(error, (*FAILOVER_ERRORS, EndpointUnavailable)):
+                    raise error
+                # The primary failed before the hedge delay: plain failover
+                self.failovers += 1
+                return await self.post_to(secondary, payload)
+
+            self.hedges += 1
+            secondary_task = loop.create_task(self.post_to(secondary, payload))
+            tasks.add(secondary_task)
+            last_error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is secondary_task:
+                            self.hedge_wins += 1
+                        return task.result()
+                    if not isinstance(error, (*FAILOVER_ERRORS, EndpointUnavailable)):
+                        raise error
+                    last_error = error
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def post_to(self, endpoint: EndpointHealth, payload: Any) -> Any:
+        """
+        Send a payload to one endpoint and record the outcome.
+
+        Args:
+            endpoint: Target endpoint
+            payload: JSON-RPC request object or batch array
+
+        Returns:
+            Any: Decoded JSON response body
+        """
+        if self.limiter is not None:
+            await self.limiter.acquire(f"rpc:{endpoint.url}")
+
+        started = time.perf_counter()
+        try:
+            response = await self.session.post(endpoint.url, json=payload)
+            if response.status_code == 429 or response.status_code >= 500:
+                raise EndpointUnavailable(endpoint.url, response.status_code, parse_retry_after(response))
+            response.raise_for_status()
+            body = response.json()
+        except (*FAILOVER_ERRORS, EndpointUnavailable) as e:
+            retry_after = getattr(e, "retry_after", None)
+            self.record_failure(endpoint, retry_after)
+            if self.limiter is not None and getattr(e, "status_code", None) == 429:
+                self.limiter.get(f"rpc:{endpoint.url}").pause(retry_after or self.cooldown)
+            raise
+        self.record_success(endpoint, (time.perf_counter() - started) * 1000, body_slot(body))
+        return body
+
+    def record_success(self, endpoint: EndpointHealth, latency_ms: float, slot: Optional[int] = None):
+        """Update an endpoint after a successful request."""
+        endpoint.requests += 1
+        endpoint.consecutive_failures = 0
+        endpoint.cooldown_until = 0.0
+        endpoint.error_rate *= 1 - self.alpha
+        endpoint.samples.append(latency_ms)
+        if endpoint.latency_ms is None:
+            endpoint.latency_ms = latency_ms
+        else:
+            endpoint.latency_ms += self.alpha * (latency_ms - endpoint.latency_ms)
+        if slot is not None and (endpoint.last_slot is None or slot > endpoint.last_slot):
+            endpoint.last_slot = slot
+
+    def record_failure(self, endpoint: EndpointHealth, retry_after: Optional[float] = None):
+        """Update an endpoint after a failed request and start its cooldown."""
+        endpoint.requests += 1
+        endpoint.errors += 1
+        endpoint.consecutive_failures += 1
+        endpoint.error_rate += self.alpha * (1 - endpoint.error_rate)
+        if retry_after is None:
+            retry_after = min(MAX_COOLDOWN, self.cooldown * 2 ** (endpoint.consecutive_failures - 1))
+        endpoint.cooldown_until = time.monotonic() + retry_after
+
+    def _ensure_probe(self):
+        """Start the background health probe when routing across several endpoints."""
+        if self._probe_task is None and self.health_interval > 0 and len(self.endpoints) > 1:
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    async def _probe_loop(self):
+        """Periodically refresh latency and slot lag for every endpoint."""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.probe()
+
+    async def probe(self):
+        """
+        Probe every endpoint with getSlot in one concurrent round.
+
+        Slot lag is measured only between the answers of the same round, at
+        the configured commitment. Slots seen in regular responses are not
+        comparable: the busiest endpoint reports them continuously (at
+        whatever commitment each request used), while idle endpoints are
+        only sampled here. Answers that arrived earlier in the round are
+        advanced by the slots elapsed since, so a slower endpoint is not
+        mistaken for a more advanced one.
+        """
+        payload = {"jsonrpc": "2.0", "id": 0, "method": "getSlot", "params": [{"commitment": self.commitment}]}
+        results = await asyncio.gather(
+            *(self._probe(endpoint, payload) for endpoint in self.endpoints),
+            return_exceptions=True,
+        )
+        samples = {
+            endpoint.url: result
+            for endpoint, result in zip(self.endpoints, results)
+            if isinstance(result, tuple)
+        }
+        if not samples:
+            return
+        finished = max(received for _, received in samples.values())
+        adjusted = {
+            url: slot + (finished - received) * 1000 / SLOT_MS
+            for url, (slot, received) in samples.items()
+        }
+        top = max(adjusted.values())
+        for endpoint in self.endpoints:
+            if endpoint.url not in samples:
+                # Failed probes put the endpoint in cooldown; its lag is unknown
+                continue
+            endpoint.slot_lag = int(top - adjusted[endpoint.url])
+            slot = samples[endpoint.url][0]
+            if endpoint.last_slot is None or slot > endpoint.last_slot:
+                endpoint.last_slot = slot
+
+    async def _probe(self, endpoint: EndpointHealth, payload: Dict[str, Any]) -> Optional[Tuple[int, float]]:
+        """Probe one endpoint with getSlot, returning the slot and when it was received."""
+        body = await self.post_to(endpoint, payload)
+        result = body.get("result") if isinstance(body, dict) else None
+        if not isinstance(result, int) or isinstance(result, bool):
+            return None
+        return result, time.monotonic()
+
+    def health(self) -> List[Dict[str, Any]]:
+        """Return health scores for every endpoint in routing order."""
+        now = time.monotonic()
+        return [
+            {
+                "url": e.url,
+                "healthy": self.is_healthy(e, now),
+                "score": round(e.score(), 3),
+                "latency_ms": round(e.latency_ms, 3) if e.latency_ms is not None else None,
+                "p95_ms": round(e.p95_ms(), 3) if e.p95_ms() is not None else None,
+                "error_rate": round(e.error_rate, 4),
+                "slot": e.last_slot,
+                "slot_lag": e.slot_lag,
+                "requests": e.requests,
+                "errors": e.errors,
+                "cooldown_remaining": round(max(0.0, e.cooldown_until - now), 3),
+            }
+            for e in self.ranked()
+        ]
+
+    def hedge_stats(self) -> Dict[str, Any]:
+        """Return hedging counters."""
+        return {
+            "budget": self.hedge_budget,
+            "eligible": self.hedge_eligible,
+            "hedged": self.hedges,
+            "secondary_wins": self.hedge_wins,
+        }
+
+    async def close(self):
+        """Stop the background health probe."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
@@ -0,0 +1,63 @@
+"""
+Single-flight request de-duplication for the Solana MCP Server.
+
+Identical calls that are in flight at the same time share one upstream
+request: the first caller starts the work and later callers await the
+same task instead of issuing their own.
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+def request_key(*parts: Any) -> str:
+    """
+    Build a stable key from JSON-serializable request parts.
+
+    Args:
+        parts: Method, URL, parameters, payload, ...
+
+    Returns:
+        str: Canonical key
+    """
+    return json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+
+class SingleFlight:
+    """Shares one in-flight task between identical concurrent calls."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``func`` unless an identical call is already in flight.
+
+        The work runs in its own task, so cancelling one waiting caller
+        does not cancel the request for the others.
+
+        Args:
+            key: Identifies identical calls
+            func: Coroutine factory performing the request
+
+        Returns:
+            Any: Result of the shared call
+        """
+        self.calls += 1
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._flights[key] = task
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return de-duplication counters."""
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._flights),
+        }
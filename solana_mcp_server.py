@@ -6,215 +6,185 @@ A Model Context Protocol server that provides onchain tools for LLMs
 to interact with the Solana blockchain network.
 """
 
+import time
+
+# Start of module imports, reported by --measure-startup
+_IMPORT_STARTED = time.perf_counter()
+
 import asyncio
-import json
+import base64
 import logging
-import os
-from typing import Any, Dict, List, Optional, Sequence
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Dict, List, Optional, Sequence, Tuple
 from urllib.parse import urlparse
 
 import httpx
-from dotenv import load_dotenv
-from mcp.server import Server
+from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
-from mcp.server.stdio import stdio_server
-from mcp.types import (
-    CallToolRequest,
-    CallToolResult,
-    ListToolsRequest,
-    TextContent,
-    Tool,
-)
-from pydantic import BaseModel
-from solana.rpc.async_api import AsyncClient
-from solana.rpc.commitment import Commitment
-from solana.rpc.types import TxOpts
+from mcp.types import TextContent, Tool
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 
-# Load environment variables
-load_dotenv()
+from config import config as app_config
+from http_session import create_http_session
+from mint_registry import MintRegistry
+from price_service import PricePoller, PriceQuote, PriceService
+from quote_cache import CachedQuote, QuoteCache
+from quote_router import QuoteCandidate, best_candidate, gather_quotes
+from rate_limiter import RateLimiterRegistry
+from response_encoder import PRETTY_PROPERTY, ResponseEncoder, ToolResponse
+from rpc_pool import RPCClientPool
+from rpc_router import RATE_LIMIT_RETRIES, parse_retry_after
+from single_flight import SingleFlight, request_key
+from token_decoder import (
+    ACCOUNT_SIZE,
+    TOKEN_PROGRAM_IDS,
+    account_data,
+    sum_amounts_by_mint,
+    token_amount,
+)
+from tool_registry import ToolRegistry, tool
+from utils import COMMON_TOKENS, format_token_amount
+from tx_store import TransactionStore
+
+_IMPORTS_FINISHED = time.perf_counter()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class SolanaConfig:
-    """Configuration for Solana connection and operations."""
-    
-    def __init__(self):
-        self.rpc_url = os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
-        self.devnet_rpc_url = os.getenv("SOLANA_DEVNET_RPC_URL", "https://api.devnet.solana.com")
-        self.private_key = os.getenv("SOLANA_PRIVATE_KEY")
-        self.commitment = Commitment(os.getenv("DEFAULT_COMMITMENT", "confirmed"))
-        self.network = os.getenv("DEFAULT_NETWORK", "mainnet")
-        self.max_transaction_amount = float(os.getenv("MAX_TRANSACTION_AMOUNT", "1.0"))
-        self.require_confirmation = os.getenv("REQUIRE_CONFIRMATION", "true").lower() == "true"
+# Optional per-call network override shared by all RPC-backed tools
+NETWORK_PROPERTY = {
+    "type": "string",
+    "description": "Network to query (mainnet, devnet or testnet). Defaults to the configured network.",
+    "enum": list(app_config.networks.keys())
+}
 
 class SolanaMCPServer:
     """Main MCP server class for Solana blockchain interactions."""
     
     def __init__(self):
-        self.config = SolanaConfig()
-        self.client: Optional[AsyncClient] = None
+        self.config = app_config
+        self.rate_limits = RateLimiterRegistry(
+            app_config.security.rate_limit_per_minute,
+            {**app_config.upstream_rate_limits, "tool": app_config.security.rate_limit_per_minute}
+        )
+        self.rpc_pool = RPCClientPool(app_config, commitment=self.config.commitment, limiter=self.rate_limits)
+        self._http: Optional[httpx.AsyncClient] = None
+        self.http_flights = SingleFlight()
+        self.tx_store = TransactionStore(app_config.tx_store_path, memory_size=app_config.tx_store_memory_size)
+        self.mints = MintRegistry(
+            self.rpc_pool, app_config.mint_registry_path, refresh_interval=app_config.mint_refresh_interval
+        )
+        self.prices = PriceService(
+            self._http_get,
+            app_config.coingecko_api_url,
+            self.mints.resolve,
+            ttl=app_config.price_cache_ttl,
+            stale_ttl=app_config.price_stale_ttl,
+            window=app_config.price_batch_window_ms / 1000
+        )
+        self.quotes = QuoteCache(
+            ttl=app_config.quote_cache_ttl, bucket_bps=app_config.quote_amount_bucket_bps
+        )
+        self.price_poller: Optional[PricePoller] = None
+        if app_config.price_poller_enabled and app_config.enable_market_data:
+            self.price_poller = PricePoller(
+                self.prices,
+                app_config.price_watchlist,
+                interval=app_config.price_poll_interval,
+                max_interval=app_config.price_poll_max_interval,
+                demand_window=app_config.price_demand_window,
+                rate_per_minute=app_config.upstream_rate_limits["coingecko"]
+            )
+        self._watch_task: Optional[asyncio.Task] = None
         self.keypair: Optional[Keypair] = None
         self.server = Server("solana-mcp-server")
         
-        # Register tool handlers
+        # Register tool handlers (tools of disabled features are left out)
+        self.encoder = ResponseEncoder(pretty=app_config.response_pretty, structured=app_config.response_structured)
+        self.tools = ToolRegistry(self, features={
+            "defi": app_config.enable_defi_tools,
+            "market_data": app_config.enable_market_data,
+            "nft": app_config.enable_nft_tools
+        }, common_properties={"pretty": PRETTY_PROPERTY})
         self._register_tools()
     
     def _register_tools(self):
-        """Register all available tools with the MCP server."""
+        """Register the tool registry's handlers with the MCP server."""
         
         @self.server.list_tools()
-        async def list_tools() -> List[Tool]:
-            """List all available Solana tools."""
-            return [
-                Tool(
-                    name="get_balance",
-                    description="Get SOL balance for a Solana address",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "address": {
-                                "type": "string",
-                                "description": "Solana public key address"
-                            }
-                        },
-                        "required": ["address"]
-                    }
-                ),
-                Tool(
-                    name="get_token_balance",
-                    description="Get SPL token balance for an address",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "address": {
-                                "type": "string",
-                                "description": "Solana public key address"
-                            },
-                            "token_mint": {
-                                "type": "string",
-                                "description": "Token mint address"
-                            }
-                        },
-                        "required": ["address", "token_mint"]
-                    }
-                ),
-                Tool(
-                    name="get_transaction",
-                    description="Get details of a Solana transaction",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "signature": {
-                                "type": "string",
-                                "description": "Transaction signature"
-                            }
-                        },
-                        "required": ["signature"]
-                    }
-                ),
-                Tool(
-                    name="get_token_price",
-                    description="Get current price of a token",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "token_symbol": {
-                                "type": "string",
-                                "description": "Token symbol (e.g., SOL, USDC)"
-                            }
-                        },
-                        "required": ["token_symbol"]
-                    }
-                ),
-                Tool(
-                    name="create_wallet",
-                    description="Generate a new Solana wallet",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                ),
-                Tool(
-                    name="get_account_info",
-                    description="Get detailed account information",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "address": {
-                                "type": "string",
-                                "description": "Solana public key address"
-                            }
-                        },
-                        "required": ["address"]
-                    }
-                ),
-                Tool(
-                    name="swap_tokens",
-                    description="Swap one SPL token for another using Jupiter Aggregator.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "input_mint": {
-                                "type": "string",
-                                "description": "The mint address of the token to swap from."
-                            },
-                            "output_mint": {
-                                "type": "string",
-                                "description": "The mint address of the token to swap to."
-                            },
-                            "amount": {
-                                "type": "integer",
-                                "description": "The amount of the input token to swap, in the smallest unit (e.g., lamports)."
-                            },
-                            "user_public_key": {
-                                "type": "string",
-                                "description": "The public key of the user's wallet performing the swap."
-                            },
-                            "slippage_bps": {
-                                "type": "integer",
-                                "description": "The slippage tolerance in basis points (e.g., 50 for 0.5%).",
-                                "default": 50
-                            }
-                        },
-                        "required": ["input_mint", "output_mint", "amount", "user_public_key"]
-                    }
-                )
-            ]
+        async def list_tools() -> Sequence[Tool]:
+            """List all enabled Solana tools."""
+            return self.tools.definitions
         
-        @self.server.call_tool()
-        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+        # Arguments are checked against the registry's precompiled validators
+        @self.server.call_tool(validate_input=False)
+        async def call_tool(name: str, arguments: Dict[str, Any]) -> ToolResponse:
             """Handle tool calls."""
+            registered = self.tools.get(name)
+            if registered is None:
+                if name in self.tools.disabled:
+                    return [TextContent(type="text", text=f"Tool {name} is disabled by configuration")]
+                return [TextContent(type="text", text=f"Unknown tool: {name}")]
             try:
-                if name == "get_balance":
-                    return await self._get_balance(arguments)
-                elif name == "get_token_balance":
-                    return await self._get_token_balance(arguments)
-                elif name == "get_transaction":
-                    return await self._get_transaction(arguments)
-                elif name == "get_token_price":
-                    return await self._get_token_price(arguments)
-                elif name == "create_wallet":
-                    return await self._create_wallet(arguments)
-                elif name == "get_account_info":
-                    return await self._get_account_info(arguments)
-                elif name == "swap_tokens":
-                    return await self._swap_tokens(arguments)
-                else:
-                    return [TextContent(type="text", text=f"Unknown tool: {name}")]
+                await self.rate_limits.acquire(f"tool:{name}")
+                
+                error = registered.validate(arguments)
+                if error is not None:
+                    return [TextContent(type="text", text=f"Input validation error: {error}")]
+                return await registered.handler(arguments)
             except Exception as e:
                 logger.error(f"Error in tool {name}: {str(e)}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
     
-    async def _ensure_client(self):
-        """Ensure Solana client is initialized."""
-        if self.client is None:
-            rpc_url = self.config.devnet_rpc_url if self.config.network == "devnet" else self.config.rpc_url
-            self.client = AsyncClient(rpc_url, commitment=self.config.commitment)
+    def initialization_options(self) -> InitializationOptions:
+        """Initialization options sent to every MCP client session."""
+        return InitializationOptions(
+            server_name="solana-mcp-server",
+            server_version="1.0.0",
+            capabilities=self.server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities=None,
+            ),
+        )
+    
+    def start(self):
+        """Start background tasks (call from within the running event loop)."""
+        if self.price_poller is not None:
+            self.price_poller.start()
+        if app_config.ws_watch_accounts:
+            self._watch_task = asyncio.create_task(self._watch_configured_accounts())
+    
+    async def close(self):
+        """Release pooled connections held by the server."""
+        if self.price_poller is not None:
+            await self.price_poller.close()
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+        await self.mints.close()
+        await self.rpc_pool.close()
+        if self._http is not None:
+            await self._http.aclose()
+        self.tx_store.close()
+    
+    async def _watch_configured_accounts(self):
+        """Watch the accounts listed in WS_WATCH_ACCOUNTS on the current network."""
+        pool = self.rpc_pool.get()
+        for address in app_config.ws_watch_accounts:
+            try:
+                if not await pool.watch_account(str(Pubkey.from_string(address))):
+                    logger.warning("WebSocket subscriptions are unavailable; WS_WATCH_ACCOUNTS is ignored")
+                    return
+            except Exception as e:
+                logger.warning(f"Cannot watch account {address}: {e}")
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared HTTP session for external APIs (created on first use)."""
+        if self._http is None:
+            self._http = create_http_session(app_config)
+        return self._http
     
     async def _ensure_keypair(self):
         """Ensure keypair is loaded from private key."""
@@ -228,131 +198,256 @@ class SolanaMCPServer:
                 logger.error(f"Failed to load keypair: {e}")
                 raise ValueError("Invalid private key format")
     
-    async def _get_balance(self, arguments: Dict[str, Any]) -> List[TextContent]:
+    def _upstream_name(self, url: str) -> str:
+        """Name of the rate limiter bucket for an external API URL."""
+        if url.startswith(app_config.coingecko_api_url):
+            return "coingecko"
+        if url.startswith(app_config.jupiter_api_url):
+            return "jupiter"
+        return urlparse(url).netloc
+    
+    async def _send_http(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send an external API request, queueing on its rate limiter and honoring Retry-After."""
+        bucket = self.rate_limits.get(self._upstream_name(url))
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            await bucket.acquire()
+            response = await self.http.request(method, url, **kwargs)
+            if response.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                return response
+            retry_after = parse_retry_after(response) or 1.0
+            logger.warning(f"Rate limited by {urlparse(url).netloc}, retrying in {retry_after}s")
+            bucket.pause(retry_after)
+    
+    async def _http_get(self, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """GET an external API, sharing identical in-flight requests."""
+        key = request_key("GET", url, params)
+        return await self.http_flights.do(key, lambda: self._send_http("GET", url, params=params))
+    
+    async def _http_post(self, url: str, payload: Dict[str, Any]) -> httpx.Response:
+        """POST JSON to an external API, sharing identical in-flight requests."""
+        key = request_key("POST", url, payload)
+        return await self.http_flights.do(key, lambda: self._send_http("POST", url, json=payload))
+    
+    def _hedged(self, tool: str) -> bool:
+        """Check whether read requests made by a tool may be hedged."""
+        return tool in app_config.rpc_hedge_tools
+    
+    async def _load_account(self, address: str, network: Optional[str] = None, hedge: bool = False) -> Dict[str, Any]:
+        """Load an account through the slot cache and getMultipleAccounts fan-in."""
+        pool = self.rpc_pool.get(network)
+        return await pool.get_account(address, self.config.commitment, hedge=hedge)
+    
+    def _format_account(self, address: str, account: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize a base64-encoded account returned by the RPC."""
+        return {
+            "address": address,
+            "lamports": account["lamports"],
+            "owner": account["owner"],
+            "executable": account["executable"],
+            "rent_epoch": account["rentEpoch"],
+            "data_length": len(base64.b64decode(account["data"][0])) if account.get("data") else 0
+        }
+    
+    @tool(
+        "get_balance",
+        "Get SOL balance for a Solana address",
+        properties={
+            "address": {
+                "type": "string",
+                "description": "Solana public key address"
+            },
+            "network": NETWORK_PROPERTY
+        },
+        required=["address"]
+    )
+    async def _get_balance(self, arguments: Dict[str, Any]) -> ToolResponse:
         """Get SOL balance for an address."""
-        await self._ensure_client()
-        
         try:
-            address = Pubkey.from_string(arguments["address"])
-            response = await self.client.get_balance(address)
+            address = str(Pubkey.from_string(arguments["address"]))
+            response = await self._load_account(address, arguments.get("network"), hedge=self._hedged("get_balance"))
             
-            if response.value is not None:
-                balance_sol = response.value / 1_000_000_000  # Convert lamports to SOL
+            if response is not None:
+                # Accounts that do not exist hold no lamports
+                account = response.get("value")
+                lamports = account["lamports"] if account else 0
+                balance_sol = lamports / 1_000_000_000  # Convert lamports to SOL
                 result = {
                     "address": arguments["address"],
                     "balance_sol": balance_sol,
-                    "balance_lamports": response.value
+                    "balance_lamports": lamports
                 }
-                return [TextContent(type="text", text=json.dumps(result, indent=2))]
+                return self.encoder.encode(result, arguments)
             else:
                 return [TextContent(type="text", text="Failed to get balance")]
         except Exception as e:
             return [TextContent(type="text", text=f"Error getting balance: {str(e)}")]
     
-    async def _get_token_balance(self, arguments: Dict[str, Any]) -> List[TextContent]:
+    @tool(
+        "get_token_balance",
+        "Get SPL token balance for an address",
+        properties={
+            "address": {
+                "type": "string",
+                "description": "Solana public key address"
+            },
+            "token_mint": {
+                "type": "string",
+                "description": "Token mint address or known symbol (e.g. USDC)"
+            },
+            "network": NETWORK_PROPERTY
+        },
+        required=["address", "token_mint"]
+    )
+    async def _get_token_balance(self, arguments: Dict[str, Any]) -> ToolResponse:
         """Get SPL token balance for an address."""
-        await self._ensure_client()
-        
         try:
-            address = Pubkey.from_string(arguments["address"])
-            token_mint = Pubkey.from_string(arguments["token_mint"])
+            address = str(Pubkey.from_string(arguments["address"]))
+            token_mint = str(Pubkey.from_string(self.mints.resolve(arguments["token_mint"]) or arguments["token_mint"]))
             
-            # Get token accounts by owner
-            response = await self.client.get_token_accounts_by_owner(
-                address, 
-                {"mint": token_mint}
+            # Get token accounts by owner (works for both SPL Token and Token-2022 mints)
+            pool = self.rpc_pool.get(arguments.get("network"))
+            commitment = self.config.commitment
+            response = await pool.cached_request(
+                "getTokenAccountsByOwner",
+                [address, {"mint": token_mint}, {"encoding": "base64", "commitment": commitment}],
+                commitment,
+                hedge=self._hedged("get_token_balance")
             )
             
-            if response.value:
-                # Get the first token account
-                token_account = response.value[0]
-                account_info = token_account.account
-                
-                # Parse token account data
-                import struct
-                data = account_info.data
-                if len(data) >= 64:
-                    amount = struct.unpack('<Q', data[0:8])[0]
-                    
-                    result = {
-                        "address": arguments["address"],
-                        "token_mint": arguments["token_mint"],
-                        "balance": amount,
-                        "token_account": str(token_account.pubkey)
-                    }
-                    return [TextContent(type="text", text=json.dumps(result, indent=2))]
+            token_accounts = []
+            for entry in response.get("value") or []:
+                data = account_data(entry["account"])
+                if len(data) >= ACCOUNT_SIZE:
+                    token_accounts.append({"pubkey": entry["pubkey"], "amount": token_amount(data)})
+            
+            if token_accounts:
+                balance = sum(account["amount"] for account in token_accounts)
+                result = {
+                    "address": arguments["address"],
+                    "token_mint": token_mint,
+                    "balance": balance,
+                    "ui_balance": await self.mints.format_amount(balance, token_mint, arguments.get("network")),
+                    "token_account": token_accounts[0]["pubkey"],
+                    "token_accounts": token_accounts
+                }
+                return self.encoder.encode(result, arguments)
             
             return [TextContent(type="text", text="No token account found")]
         except Exception as e:
             return [TextContent(type="text", text=f"Error getting token balance: {str(e)}")]
     
-    async def _get_transaction(self, arguments: Dict[str, Any]) -> List[TextContent]:
-        """Get transaction details."""
-        await self._ensure_client()
+    async def _fetch_transaction(self, signature: str, network: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a raw transaction, serving finalized transactions from the local store.
+        
+        The transaction is requested once at the configured commitment. Below
+        finalized, its status is requested in the same JSON-RPC batch and the
+        transaction is persisted only once it is finalized.
+        """
+        network = network or app_config.current_network
+        tx = await self.tx_store.get(network, signature)
+        if tx is not None:
+            return tx
+        
+        pool = self.rpc_pool.get(network)
+        hedge = self._hedged("get_transaction")
+        params = {"encoding": "json", "maxSupportedTransactionVersion": 0, "commitment": self.config.commitment}
+        if self.config.commitment == "finalized":
+            tx = await pool.request("getTransaction", [signature, params], hedge=hedge)
+            finalized = tx is not None
+        else:
+            tx, statuses = await asyncio.gather(
+                pool.request("getTransaction", [signature, params], hedge=hedge),
+                pool.request("getSignatureStatuses", [[signature], {"searchTransactionHistory": True}], hedge=hedge)
+            )
+            status = ((statuses or {}).get("value") or [None])[0]
+            finalized = tx is not None and status is not None and status.get("confirmationStatus") == "finalized"
         
+        if finalized:
+            await self.tx_store.put(network, signature, tx)
+        return tx
+    
+    @tool(
+        "get_transaction",
+        "Get details of a Solana transaction",
+        properties={
+            "signature": {
+                "type": "string",
+                "description": "Transaction signature"
+            },
+            "network": NETWORK_PROPERTY
+        },
+        required=["signature"]
+    )
+    async def _get_transaction(self, arguments: Dict[str, Any]) -> ToolResponse:
+        """Get transaction details."""
         try:
             signature = arguments["signature"]
-            response = await self.client.get_transaction(signature)
+            tx = await self._fetch_transaction(signature, arguments.get("network"))
             
-            if response.value:
-                tx = response.value
+            if tx:
+                meta = tx.get("meta")
                 result = {
                     "signature": signature,
-                    "slot": tx.slot,
-                    "block_time": tx.block_time,
+                    "slot": tx.get("slot"),
+                    "block_time": tx.get("blockTime"),
                     "meta": {
-                        "fee": tx.transaction.meta.fee if tx.transaction.meta else None,
-                        "status": "success" if tx.transaction.meta and tx.transaction.meta.err is None else "failed"
+                        "fee": meta.get("fee") if meta else None,
+                        "status": "success" if meta and meta.get("err") is None else "failed"
                     }
                 }
-                return [TextContent(type="text", text=json.dumps(result, indent=2))]
+                return self.encoder.encode(result, arguments)
             else:
                 return [TextContent(type="text", text="Transaction not found")]
         except Exception as e:
             return [TextContent(type="text", text=f"Error getting transaction: {str(e)}")]
     
-    async def _get_token_price(self, arguments: Dict[str, Any]) -> List[TextContent]:
+    async def _get_prices(self, tokens: List[str]) -> Dict[str, Optional[PriceQuote]]:
+        """Get prices from the poller snapshot, fetching tokens it does not cover yet."""
+        quotes: Dict[str, Optional[PriceQuote]] = {}
+        if self.price_poller is not None:
+            quotes = {token: self.price_poller.get(token) for token in tokens}
+        missing = [token for token in tokens if quotes.get(token) is None]
+        if missing:
+            quotes.update(await self.prices.get_prices(missing))
+        return quotes
+    
+    @tool(
+        "get_token_price",
+        "Get current price of a token",
+        properties={
+            "token_symbol": {
+                "type": "string",
+                "description": "Token symbol (e.g., SOL, USDC), CoinGecko id or mint address"
+            }
+        },
+        required=["token_symbol"],
+        feature="market_data"
+    )
+    async def _get_token_price(self, arguments: Dict[str, Any]) -> ToolResponse:
         """Get current token price from CoinGecko."""
         try:
-            token_symbol = arguments["token_symbol"].lower()
-            
-            # Map common Solana tokens to CoinGecko IDs
-            token_map = {
-                "sol": "solana",
-                "usdc": "usd-coin",
-                "usdt": "tether",
-                "ray": "raydium",
-                "srm": "serum"
-            }
+            token = arguments["token_symbol"]
+            quote = (await self._get_prices([token]))[token]
             
-            token_id = token_map.get(token_symbol, token_symbol)
+            if quote is not None:
+                result = {
+                    "token": token.upper() if len(token) < 32 else token,
+                    "price_usd": quote.price_usd,
+                    "change_24h": quote.change_24h,
+                    "as_of": datetime.fromtimestamp(quote.fetched_at, timezone.utc).isoformat()
+                }
+                return self.encoder.encode(result, arguments)
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"https://api.coingecko.com/api/v3/simple/price",
-                    params={
-                        "ids": token_id,
-                        "vs_currencies": "usd",
-                        "include_24hr_change": "true"
-                    }
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if token_id in data:
-                        price_data = data[token_id]
-                        result = {
-                            "token": token_symbol.upper(),
-                            "price_usd": price_data.get("usd"),
-                            "change_24h": price_data.get("usd_24h_change")
-                        }
-                        return [TextContent(type="text", text=json.dumps(result, indent=2))]
-                
-                return [TextContent(type="text", text=f"Price data not found for {token_symbol}")]
+            return [TextContent(type="text", text=f"Price data not found for {token}")]
         except Exception as e:
             return [TextContent(type="text", text=f"Error getting token price: {str(e)}")]
     
-    async def _create_wallet(self, arguments: Dict[str, Any]) -> List[TextContent]:
+    @tool(
+        "create_wallet",
+        "Generate a new Solana wallet"
+    )
+    async def _create_wallet(self, arguments: Dict[str, Any]) -> ToolResponse:
         """Generate a new Solana wallet."""
         try:
             # Generate new keypair
@@ -370,116 +465,815 @@ class SolanaMCPServer:
                 "warning": "Store the private key securely. Never share it with anyone."
             }
             
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+            return self.encoder.encode(result, arguments)
         except Exception as e:
             return [TextContent(type="text", text=f"Error creating wallet: {str(e)}")]
     
-    async def _get_account_info(self, arguments: Dict[str, Any]) -> List[TextContent]:
+    @tool(
+        "get_account_info",
+        "Get detailed account information",
+        properties={
+            "address": {
+                "type": "string",
+                "description": "Solana public key address"
+            },
+            "network": NETWORK_PROPERTY
+        },
+        required=["address"]
+    )
+    async def _get_account_info(self, arguments: Dict[str, Any]) -> ToolResponse:
         """Get detailed account information."""
-        await self._ensure_client()
-        
         try:
-            address = Pubkey.from_string(arguments["address"])
-            response = await self.client.get_account_info(address)
+            address = str(Pubkey.from_string(arguments["address"]))
+            response = await self._load_account(address, arguments.get("network"), hedge=self._hedged("get_account_info"))
             
-            if response.value:
-                account = response.value
-                result = {
-                    "address": arguments["address"],
-                    "lamports": account.lamports,
-                    "owner": str(account.owner),
-                    "executable": account.executable,
-                    "rent_epoch": account.rent_epoch,
-                    "data_length": len(account.data) if account.data else 0
-                }
-                return [TextContent(type="text", text=json.dumps(result, indent=2))]
+            if response and response.get("value"):
+                result = self._format_account(arguments["address"], response["value"])
+                return self.encoder.encode(result, arguments)
             else:
                 return [TextContent(type="text", text="Account not found")]
         except Exception as e:
             return [TextContent(type="text", text=f"Error getting account info: {str(e)}")]
 
-    async def _swap_tokens(self, arguments: Dict[str, Any]) -> List[TextContent]:
-        """Swap tokens using Jupiter Aggregator."""
-        await self._ensure_client()
+    async def _fetch_quote(self, source: str, params: Dict[str, Any], shared: bool = True) -> Dict[str, Any]:
+        """
+        Fetch a quote from a Jupiter-compatible aggregator.
+        
+        Shared requests join identical ones in flight and keep running when
+        one caller is cancelled; unshared requests are aborted on cancellation.
+        """
+        if shared:
+            response = await self._http_get(f"{source}/quote", params)
+        else:
+            response = await self._send_http("GET", f"{source}/quote", params=params)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _get_quote(
+        self,
+        input_mint: str,
+        output_mint: str,
+        amount: int,
+        slippage_bps: int,
+        exact: bool = True,
+        best_execution: bool = False
+    ) -> Tuple[CachedQuote, bool, List[QuoteCandidate]]:
+        """
+        Get a swap quote, serving it from the quote cache while fresh.
+        
+        With best execution, quotes with several routing variants (and from the
+        secondary aggregators) are requested concurrently and the best one that
+        arrives within the latency budget is used. Best-execution quotes are
+        cached apart from single-route ones, and the requests still running at
+        the end of the budget are aborted.
+        
+        Returns:
+            Tuple: The quote entry, whether it came from the cache, and the compared candidates
+        """
+        cached = self.quotes.get(
+            input_mint, output_mint, amount, slippage_bps, exact=exact, best_execution=best_execution
+        )
+        if cached is not None:
+            return cached, True, []
+        
+        params = {
+            "inputMint": input_mint,
+            "outputMint": output_mint,
+            "amount": amount,
+            "slippageBps": slippage_bps
+        }
+        candidates: List[QuoteCandidate] = []
+        if best_execution:
+            candidates = await gather_quotes(
+                lambda source, extra: self._fetch_quote(source, {**params, **extra}, shared=False),
+                [app_config.jupiter_api_url, *app_config.swap_secondary_quote_urls],
+                app_config.swap_quote_budget_ms / 1000
+            )
+            best = best_candidate(candidates)
+            if best is None:
+                errors = "; ".join(f"{c.variant}@{c.source}: {c.error}" for c in candidates)
+                raise RuntimeError(f"No quote received: {errors}")
+            quote, source = best.quote, best.source
+        else:
+            quote, source = await self._fetch_quote(app_config.jupiter_api_url, params), app_config.jupiter_api_url
+        
+        entry = self.quotes.put(
+            input_mint, output_mint, amount, slippage_bps, quote, source=source, best_execution=best_execution
+        )
+        return entry, False, candidates
+    
+    @tool(
+        "get_swap_quote",
+        "Get a Jupiter swap quote (served from a short-lived cache) without building a transaction",
+        properties={
+            "input_mint": {
+                "type": "string",
+                "description": "The mint address or symbol of the token to swap from."
+            },
+            "output_mint": {
+                "type": "string",
+                "description": "The mint address or symbol of the token to swap to."
+            },
+            "amount": {
+                "type": "integer",
+                "description": "The amount of the input token to swap, in its smallest unit."
+            },
+            "slippage_bps": {
+                "type": "integer",
+                "description": "The slippage tolerance in basis points (e.g., 50 for 0.5%).",
+                "default": 50
+            },
+            "refresh": {
+                "type": "boolean",
+                "description": "Drop cached quotes for this token pair and fetch a fresh one.",
+                "default": False
+            },
+            "best_execution": {
+                "type": "boolean",
+                "description": "Compare concurrent quotes across routing variants and aggregators and use the best one."
+            }
+        },
+        required=["input_mint", "output_mint", "amount"],
+        feature="defi"
+    )
+    async def _get_swap_quote(self, arguments: Dict[str, Any]) -> ToolResponse:
+        """Get a swap quote without building a transaction."""
+        try:
+            input_mint = self.mints.resolve(arguments["input_mint"]) or arguments["input_mint"]
+            output_mint = self.mints.resolve(arguments["output_mint"]) or arguments["output_mint"]
+            amount = int(arguments["amount"])
+            slippage_bps = arguments.get("slippage_bps", 50)
+            if arguments.get("refresh", False):
+                self.quotes.invalidate(input_mint, output_mint)
+            
+            entry, cached, candidates = await self._get_quote(
+                input_mint, output_mint, amount, slippage_bps, exact=False,
+                best_execution=arguments.get("best_execution", app_config.swap_best_execution)
+            )
+            quote = entry.quote
+            in_amount = int(quote.get("inAmount", amount))
+            out_amount = int(quote.get("outAmount", 0))
+            result = {
+                "input_mint": input_mint,
+                "output_mint": output_mint,
+                "in_amount": in_amount,
+                "out_amount": out_amount,
+                "min_out_amount": int(quote.get("otherAmountThreshold", out_amount)),
+                "price_impact_pct": quote.get("priceImpactPct"),
+                "route": [step.get("swapInfo", {}).get("label") for step in quote.get("routePlan", [])],
+                "source": entry.source,
+                "cached": cached,
+                "age_ms": round(entry.age_ms(), 1)
+            }
+            if candidates:
+                result["candidates"] = [candidate.summary() for candidate in candidates]
+            if in_amount != amount and in_amount:
+                # Quote for a nearby amount from the same bucket: scale the estimate
+                result["estimated_out_amount"] = out_amount * amount // in_amount
+            return self.encoder.encode(result, arguments)
+        except httpx.HTTPStatusError as e:
+            return [TextContent(type="text", text=f"Error getting swap quote: {e.response.text}")]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error getting swap quote: {str(e)}")]
+    
+    async def _timed(self, name: str, coro: Awaitable[Any], timings: Dict[str, float]) -> Any:
+        """Await a pipeline stage, recording its duration in milliseconds."""
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            timings[f"{name}_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    
+    async def _latest_blockhash(self) -> Dict[str, Any]:
+        """Get a recent blockhash and its last valid block height."""
+        pool = self.rpc_pool.get()
+        response = await pool.cached_request(
+            "getLatestBlockhash", [{"commitment": "confirmed"}], "confirmed"
+        )
+        return response["value"]
+    
+    async def _estimate_priority_fee(self) -> Optional[int]:
+        """Estimate a compute unit price (micro-lamports) from recent prioritization fees."""
+        percentile = app_config.swap_priority_fee_percentile
+        if percentile <= 0:
+            return None
+        pool = self.rpc_pool.get()
+        fees = await pool.cached_request("getRecentPrioritizationFees", [[]], "confirmed")
+        values = sorted(fee["prioritizationFee"] for fee in fees or [])
+        if not values:
+            return None
+        index = min(len(values) - 1, len(values) * percentile // 100)
+        return min(values[index], app_config.swap_max_priority_fee)
+    
+    async def _swap_value_sol(self, input_mint: str, amount: int) -> Optional[float]:
+        """
+        Value a swap input in SOL, for checking against the transaction limit.
+
+        Args:
+            input_mint: Input token mint
+            amount: Raw input amount
+
+        Returns:
+            Optional[float]: Value in SOL, or None if the token cannot be priced
+        """
+        if input_mint == COMMON_TOKENS["SOL"]:
+            return amount / 1e9
+        info = await self.mints.get(input_mint)
+        if info is None:
+            return None
+        quotes = await self._get_prices([input_mint, "SOL"])
+        token_quote, sol_quote = quotes.get(input_mint), quotes.get("SOL")
+        if token_quote is None or sol_quote is None or not sol_quote.price_usd:
+            return None
+        return format_token_amount(amount, info.decimals) * token_quote.price_usd / sol_quote.price_usd
+
+    async def _check_swap_execution(self, arguments: Dict[str, Any]) -> Optional[str]:
+        """
+        Check whether a swap may be signed and submitted by the server.
+
+        Args:
+            arguments: swap_tokens arguments
+
+        Returns:
+            Optional[str]: Reason for refusing, or None if execution is allowed
+        """
+        if not app_config.swap_local_execution:
+            return "Local swap execution is disabled. Set SWAP_LOCAL_EXECUTION=true to enable it."
+        await self._ensure_keypair()
+        if self.keypair is None:
+            return "Local swap execution requires SOLANA_PRIVATE_KEY to be configured."
+        if arguments["user_public_key"] != str(self.keypair.pubkey()):
+            return f"user_public_key must be the server wallet ({self.keypair.pubkey()}) to execute a swap."
+        if self.config.security.require_confirmation and not arguments.get("confirm", False):
+            return ("Swap execution requires confirmation. Review the quote with get_swap_quote "
+                    "and call swap_tokens again with confirm=true.")
+
+        value = await self._swap_value_sol(arguments["input_mint"], int(arguments["amount"]))
+        if value is None:
+            return f"Cannot value {arguments['input_mint']} in SOL to check the transaction limit; refusing to execute."
+        if value > self.config.security.max_transaction_amount:
+            return (f"Swap input is worth {value:.6f} SOL, above the limit of "
+                    f"{self.config.security.max_transaction_amount} SOL (MAX_TRANSACTION_AMOUNT).")
+        return None
+
+    async def _execute_swap(
+        self,
+        swap_transaction: str,
+        last_valid_block_height: Optional[int],
+        timings: Dict[str, float],
+    ) -> Dict[str, Any]:
+        """
+        Sign a swap transaction with the server wallet, submit it and wait for confirmation.
+
+        The transaction is sent with preflight checks skipped and rebroadcast on
+        every poll until it is confirmed, fails, or its blockhash expires.
+
+        Args:
+            swap_transaction: Base64 encoded unsigned versioned transaction
+            last_valid_block_height: Block height after which the blockhash is expired
+            timings: Stage durations to add to
+
+        Returns:
+            Dict[str, Any]: Signature, final status and, if available, slot and error
+        """
+        from solders.transaction import VersionedTransaction
         
+        unsigned = VersionedTransaction.from_bytes(base64.b64decode(swap_transaction))
+        signed = VersionedTransaction(unsigned.message, [self.keypair])
+        signature = str(signed.signatures[0])
+        raw = base64.b64encode(bytes(signed)).decode("utf-8")
+
+        pool = self.rpc_pool.get()
+        # A signature subscription ends the poll wait as soon as the transaction lands
+        landed = asyncio.Event()
+        subscription = None
+        if pool.subscriptions is not None:
+            subscription = await pool.subscriptions.subscribe(
+                "signatureSubscribe", [signature, {"commitment": "confirmed"}],
+                on_notification=lambda result: landed.set()
+            )
+
+        send_params = [raw, {"encoding": "base64", "skipPreflight": True, "maxRetries": 0}]
+        started = time.perf_counter()
+        deadline = time.monotonic() + app_config.swap_confirm_timeout
+        interval = app_config.swap_confirm_poll_ms / 1000
+        try:
+            await self._timed("send", pool.request("sendTransaction", send_params), timings)
+            started = time.perf_counter()
+            while True:
+                try:
+                    await asyncio.wait_for(landed.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+                statuses, height = await asyncio.gather(
+                    pool.request("getSignatureStatuses", [[signature]]),
+                    pool.request("getBlockHeight", [{"commitment": "confirmed"}])
+                )
+                status = statuses["value"][0]
+                if status is not None:
+                    if status.get("err") is not None:
+                        return {"signature": signature, "status": "failed", "slot": status.get("slot"), "error": status["err"]}
+                    if status.get("confirmationStatus") in ("confirmed", "finalized"):
+                        return {"signature": signature, "status": status["confirmationStatus"], "slot": status.get("slot")}
+                if last_valid_block_height is not None and height > last_valid_block_height:
+                    return {"signature": signature, "status": "expired"}
+                if time.monotonic() >= deadline:
+                    return {"signature": signature, "status": "unconfirmed"}
+                try:
+                    await pool.request("sendTransaction", send_params)
+                except Exception as e:
+                    logger.debug(f"Swap rebroadcast failed: {e}")
+        finally:
+            timings["confirm_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if subscription is not None:
+                await pool.subscriptions.unsubscribe(subscription)
+
+    @tool(
+        "swap_tokens",
+        "Swap one SPL token for another using Jupiter Aggregator.",
+        properties={
+            "input_mint": {
+                "type": "string",
+                "description": "The mint address of the token to swap from."
+            },
+            "output_mint": {
+                "type": "string",
+                "description": "The mint address of the token to swap to."
+            },
+            "amount": {
+                "type": "integer",
+                "description": "The amount of the input token to swap, in the smallest unit (e.g., lamports)."
+            },
+            "user_public_key": {
+                "type": "string",
+                "description": "The public key of the user's wallet performing the swap."
+            },
+            "slippage_bps": {
+                "type": "integer",
+                "description": "The slippage tolerance in basis points (e.g., 50 for 0.5%).",
+                "default": 50
+            },
+            "best_execution": {
+                "type": "boolean",
+                "description": "Compare concurrent quotes across routing variants and aggregators and use the best one."
+            },
+            "execute": {
+                "type": "boolean",
+                "description": "Sign the swap with the server's wallet, submit it and wait for confirmation (requires SWAP_LOCAL_EXECUTION).",
+                "default": False
+            },
+            "confirm": {
+                "type": "boolean",
+                "description": "Explicit user approval to execute the swap (required when REQUIRE_CONFIRMATION is enabled).",
+                "default": False
+            }
+        },
+        required=["input_mint", "output_mint", "amount", "user_public_key"],
+        feature="defi"
+    )
+    async def _swap_tokens(self, arguments: Dict[str, Any]) -> ToolResponse:
+        """Swap tokens using Jupiter Aggregator."""
         input_mint = arguments["input_mint"]
         output_mint = arguments["output_mint"]
         amount = arguments["amount"]
         user_public_key = arguments["user_public_key"]
         slippage_bps = arguments.get("slippage_bps", 50) # Default 0.5%
 
-        jup_api_base = "https://quote-api.jup.ag/v6"
+        best_execution = arguments.get("best_execution", app_config.swap_best_execution)
+        execute = arguments.get("execute", False)
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
 
-        async with httpx.AsyncClient() as client:
-            # 1. Get quote
-            quote_url = f"{jup_api_base}/quote"
-            quote_params = {
-                "inputMint": input_mint,
-                "outputMint": output_mint,
-                "amount": amount,
-                "slippageBps": slippage_bps
-            }
-            
+        if execute:
             try:
-                quote_response = await client.get(quote_url, params=quote_params)
-                quote_response.raise_for_status()
-                quote_data = quote_response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Jupiter quote API error: {e.response.text}")
-                return [TextContent(type="text", text=f"Error getting swap quote: {e.response.text}")]
+                refusal = await self._check_swap_execution(arguments)
             except Exception as e:
-                logger.error(f"Error getting swap quote: {e}")
-                return [TextContent(type="text", text=f"Error getting swap quote: {str(e)}")]
-
-            # 2. Get swap transaction
-            swap_url = f"{jup_api_base}/swap"
-            swap_payload = {
-                "userPublicKey": user_public_key,
-                "quoteResponse": quote_data,
-                "wrapAndUnwrapSol": True, # Automatically wrap/unwrap SOL if needed
-            }
+                refusal = f"Error checking swap execution: {str(e)}"
+            if refusal:
+                return [TextContent(type="text", text=refusal)]
 
-            try:
-                swap_response = await client.post(swap_url, json=swap_payload)
-                swap_response.raise_for_status()
-                swap_data = swap_response.json()
-                
-                swap_transaction = swap_data.get("swapTransaction")
-                if not swap_transaction:
-                    return [TextContent(type="text", text="Failed to get swap transaction from Jupiter.")]
+        # 1. Get quote, recent blockhash and priority fee estimate concurrently
+        # (a quote for exactly this amount is reused while it is fresh)
+        quote_result, blockhash, priority_fee = await asyncio.gather(
+            self._timed("quote", self._get_quote(
+                input_mint, output_mint, amount, slippage_bps, best_execution=best_execution
+            ), timings),
+            self._timed("blockhash", self._latest_blockhash(), timings),
+            self._timed("priority_fee", self._estimate_priority_fee(), timings),
+            return_exceptions=True
+        )
+        if isinstance(quote_result, httpx.HTTPStatusError):
+            logger.error(f"Jupiter quote API error: {quote_result.response.text}")
+            return [TextContent(type="text", text=f"Error getting swap quote: {quote_result.response.text}")]
+        if isinstance(quote_result, Exception):
+            logger.error(f"Error getting swap quote: {quote_result}")
+            return [TextContent(type="text", text=f"Error getting swap quote: {str(quote_result)}")]
+        entry, _, candidates = quote_result
+        quote_data = entry.quote
+        # Blockhash and fee estimates are advisory; a failure does not block the swap
+        for stage, value in (("blockhash", blockhash), ("priority fee", priority_fee)):
+            if isinstance(value, Exception):
+                logger.warning(f"Swap {stage} prefetch failed: {value}")
+        blockhash = None if isinstance(blockhash, Exception) else blockhash
+        priority_fee = None if isinstance(priority_fee, Exception) else priority_fee
 
+        # 2. Get swap transaction from the aggregator that produced the quote
+        swap_url = f"{entry.source}/swap"
+        swap_payload = {
+            "userPublicKey": user_public_key,
+            "quoteResponse": quote_data,
+            "wrapAndUnwrapSol": True, # Automatically wrap/unwrap SOL if needed
+            "dynamicComputeUnitLimit": True,
+        }
+        if priority_fee:
+            swap_payload["computeUnitPriceMicroLamports"] = priority_fee
+
+        try:
+            swap_response = await self._timed("swap_build", self._http_post(swap_url, swap_payload), timings)
+            swap_response.raise_for_status()
+            swap_data = swap_response.json()
+            
+            swap_transaction = swap_data.get("swapTransaction")
+            if not swap_transaction:
+                return [TextContent(type="text", text="Failed to get swap transaction from Jupiter.")]
+
+            last_valid_block_height = swap_data.get("lastValidBlockHeight")
+            if last_valid_block_height is None and blockhash:
+                last_valid_block_height = blockhash.get("lastValidBlockHeight")
+
+            if execute:
+                # The quote is spent (or the attempt failed) either way; do not reuse it
+                self.quotes.invalidate(input_mint, output_mint)
+                try:
+                    execution = await self._timed(
+                        "execute", self._execute_swap(swap_transaction, last_valid_block_height, timings), timings
+                    )
+                except Exception as e:
+                    logger.error(f"Error executing swap: {e}")
+                    return [TextContent(type="text", text=f"Error executing swap: {str(e)}")]
+                timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
                 result = {
-                    "message": "Swap transaction created successfully. Please sign and send this transaction.",
-                    "swapTransaction": swap_transaction # This is a base64 encoded transaction
+                    "message": f"Swap transaction {execution['status']}.",
+                    **execution,
+                    "lastValidBlockHeight": last_valid_block_height,
+                    "priority_fee_micro_lamports": priority_fee,
+                    "timings": timings
                 }
-                return [TextContent(type="text", text=json.dumps(result, indent=2))]
+                if candidates:
+                    result["quote_source"] = entry.source
+                    result["candidates"] = [candidate.summary() for candidate in candidates]
+                return self.encoder.encode(result, arguments)
 
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Jupiter swap API error: {e.response.text}")
-                return [TextContent(type="text", text=f"Error creating swap transaction: {e.response.text}")]
-            except Exception as e:
-                logger.error(f"Error creating swap transaction: {e}")
-                return [TextContent(type="text", text=f"Error creating swap transaction: {str(e)}")]
+            timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            result = {
+                "message": "Swap transaction created successfully. Please sign and send this transaction.",
+                "swapTransaction": swap_transaction, # This is a base64 encoded transaction
+                "lastValidBlockHeight": last_valid_block_height,
+                "priority_fee_micro_lamports": priority_fee,
+                "recent_blockhash": blockhash,
+                "timings": timings
+            }
+            if candidates:
+                result["quote_source"] = entry.source
+                result["candidates"] = [candidate.summary() for candidate in candidates]
+            return self.encoder.encode(result, arguments)
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Jupiter swap API error: {e.response.text}")
+            # The quote may have been rejected as stale; do not reuse it
+            self.quotes.invalidate(input_mint, output_mint)
+            return [TextContent(type="text", text=f"Error creating swap transaction: {e.response.text}")]
+        except Exception as e:
+            logger.error(f"Error creating swap transaction: {e}")
+            return [TextContent(type="text", text=f"Error creating swap transaction: {str(e)}")]
+
+    @tool(
+        "get_multiple_accounts",
+        "Get account information for up to hundreds of addresses in one call",
+        properties={
+            "addresses": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "List of Solana public key addresses"
+            },
+            "network": NETWORK_PROPERTY
+        },
+        required=["addresses"]
+    )
+    async def _get_multiple_accounts(self, arguments: Dict[str, Any]) -> ToolResponse:
+        """Get account information for a list of addresses."""
+        try:
+            addresses = [str(Pubkey.from_string(address)) for address in arguments["addresses"]]
+            pool = self.rpc_pool.get(arguments.get("network"))
+            responses = await pool.get_accounts(
+                addresses, self.config.commitment, hedge=self._hedged("get_multiple_accounts")
+            )
+            
+            accounts = []
+            for address, response in zip(addresses, responses):
+                account = response.get("value")
+                if account:
+                    accounts.append(self._format_account(address, account))
+                else:
+                    accounts.append({"address": address, "exists": False})
+            
+            result = {
+                "slot": responses[0]["context"].get("slot") if responses else None,
+                "accounts": accounts
+            }
+            return self.encoder.encode(result, arguments)
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error getting multiple accounts: {str(e)}")]
+
+    @tool(
+        "get_balances",
+        "Get SOL balances for hundreds or thousands of addresses in one call, returned as a compact table",
+        properties={
+            "addresses": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "List of Solana public key addresses"
+            },
+            "network": NETWORK_PROPERTY
+        },
+        required=["addresses"]
+    )
+    async def _get_balances(self, arguments: Dict[str, Any]) -> ToolResponse:
+        """Get SOL balances for a list of addresses."""
+        try:
+            addresses = []
+            invalid = []
+            for address in arguments["addresses"]:
+                try:
+                    addresses.append(str(Pubkey.from_string(address)))
+                except ValueError:
+                    invalid.append(address)
+            
+            pool = self.rpc_pool.get(arguments.get("network"))
+            response = await pool.get_lamports(
+                addresses, self.config.commitment, hedge=self._hedged("get_balances")
+            )
+            
+            # Accounts that do not exist hold no lamports
+            rows = [
+                [address, lamports or 0, lamports is not None]
+                for address, lamports in zip(addresses, response["lamports"])
+            ]
+            total_lamports = sum(row[1] for row in rows)
+            result = {
+                "slot": response["slot"],
+                "columns": ["address", "lamports", "exists"],
+                "rows": rows,
+                "total_lamports": total_lamports,
+                "total_sol": total_lamports / 1_000_000_000,
+                "invalid": invalid
+            }
+            return self.encoder.encode(result, arguments)
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error getting balances: {str(e)}")]
+
+    async def _fetch_token_accounts(self, owner: str, network: Optional[str] = None, hedge: bool = False) -> Dict[str, Any]:
+        """Fetch the token accounts of an owner under both token programs concurrently."""
+        pool = self.rpc_pool.get(network)
+        commitment = self.config.commitment
+        responses = await asyncio.gather(*(
+            pool.cached_request(
+                "getTokenAccountsByOwner",
+                [owner, {"programId": program_id}, {"encoding": "base64", "commitment": commitment}],
+                commitment,
+                hedge=hedge
+            )
+            for program_id in TOKEN_PROGRAM_IDS
+        ))
+        return {
+            "slot": max(response.get("context", {}).get("slot", 0) for response in responses),
+            "accounts": [entry for response in responses for entry in response.get("value") or []]
+        }
+    
+    @tool(
+        "get_portfolio",
+        "Get all SPL Token and Token-2022 holdings of an address, aggregated per mint and valued in USD",
+        properties={
+            "address": {
+                "type": "string",
+                "description": "The Solana public key address of the owner"
+            },
+            "include_prices": {
+                "type": "boolean",
+                "description": "Value holdings in USD (requires market data to be enabled)",
+                "default": True
+            },
+            "network": NETWORK_PROPERTY
+        },
+        required=["address"]
+    )
+    async def _get_portfolio(self, arguments: Dict[str, Any]) -> ToolResponse:
+        """Get all token holdings of an address."""
+        try:
+            owner = str(Pubkey.from_string(arguments["address"]))
+            network = arguments.get("network")
+            token_accounts = await self._fetch_token_accounts(owner, network, hedge=self._hedged("get_portfolio"))
+            
+            totals = sum_amounts_by_mint([account_data(entry["account"]) for entry in token_accounts["accounts"]])
+            mints = [mint for mint, amount in totals.items() if amount > 0]
+            
+            # Decimals and prices are independent, so look them up concurrently
+            include_prices = arguments.get("include_prices", True) and app_config.enable_market_data
+            infos, quotes = await asyncio.gather(
+                self.mints.get_many(mints, network),
+                self._get_prices(mints if include_prices else [])
+            )
+            
+            holdings = []
+            for mint in mints:
+                info = infos.get(mint)
+                mint_decimals = info.decimals if info is not None else None
+                amount = format_token_amount(totals[mint], mint_decimals) if mint_decimals is not None else None
+                quote = quotes.get(mint)
+                price = quote.price_usd if quote is not None else None
+                holdings.append({
+                    "mint": mint,
+                    "symbol": self.mints.symbol(mint),
+                    "amount_raw": totals[mint],
+                    "decimals": mint_decimals,
+                    "amount": amount,
+                    "price_usd": price,
+                    "value_usd": amount * price if amount is not None and price is not None else None
+                })
+            holdings.sort(key=lambda holding: holding["value_usd"] or 0, reverse=True)
+            
+            result = {
+                "address": arguments["address"],
+                "slot": token_accounts["slot"],
+                "token_accounts": len(token_accounts["accounts"]),
+                "holdings": holdings,
+                "total_value_usd": sum(holding["value_usd"] or 0 for holding in holdings)
+            }
+            return self.encoder.encode(result, arguments)
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error getting portfolio: {str(e)}")]
+
+    @tool(
+        "watch_account",
+        "Keep an account current through a WebSocket subscription, so balance and account reads are served locally",
+        properties={
+            "address": {
+                "type": "string",
+                "description": "Solana public key address"
+            },
+            "network": NETWORK_PROPERTY
+        },
+        required=["address"]
+    )
+    async def _watch_account(self, arguments: Dict[str, Any]) -> ToolResponse:
+        """Start watching an account."""
+        try:
+            address = str(Pubkey.from_string(arguments["address"]))
+            pool = self.rpc_pool.get(arguments.get("network"))
+            if not await pool.watch_account(address):
+                return [TextContent(type="text", text="WebSocket subscriptions are disabled or not configured for this network")]
+            result = {
+                "address": address,
+                "watching": True,
+                "watchers": pool.watched_accounts()[address]
+            }
+            return self.encoder.encode(result, arguments)
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error watching account: {str(e)}")]
+
+    @tool(
+        "unwatch_account",
+        "Release a watch taken with watch_account",
+        properties={
+            "address": {
+                "type": "string",
+                "description": "Solana public key address"
+            },
+            "network": NETWORK_PROPERTY
+        },
+        required=["address"]
+    )
+    async def _unwatch_account(self, arguments: Dict[str, Any]) -> ToolResponse:
+        """Stop watching an account."""
+        try:
+            address = str(Pubkey.from_string(arguments["address"]))
+            pool = self.rpc_pool.get(arguments.get("network"))
+            if not await pool.unwatch_account(address):
+                return [TextContent(type="text", text=f"Account {address} is not watched")]
+            result = {
+                "address": address,
+                "watching": address in pool.watched_accounts(),
+                "watchers": pool.watched_accounts().get(address, 0)
+            }
+            return self.encoder.encode(result, arguments)
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error unwatching account: {str(e)}")]
+
+    @tool(
+        "get_rpc_health",
+        "Get health scores (latency, error rate, slot lag) for the RPC endpoints of a network",
+        properties={
+            "network": NETWORK_PROPERTY
+        }
+    )
+    async def _get_rpc_health(self, arguments: Dict[str, Any]) -> ToolResponse:
+        """Get RPC endpoint health scores."""
+        try:
+            network = arguments.get("network") or app_config.current_network
+            result = {
+                "network": network,
+                "endpoints": self.rpc_pool.health(network)
+            }
+            return self.encoder.encode(result, arguments)
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error getting RPC health: {str(e)}")]
+
+    @tool(
+        "get_server_stats",
+        "Get diagnostic statistics for the server's RPC pools and caches"
+    )
+    async def _get_server_stats(self, arguments: Dict[str, Any]) -> ToolResponse:
+        """Get connection pool and cache diagnostics."""
+        result = {
+            "rpc_pool": self.rpc_pool.stats(),
+            "transaction_store": self.tx_store.stats(),
+            "mint_registry": self.mints.stats(),
+            "prices": self.prices.stats(),
+            "swap_quotes": self.quotes.stats(),
+            "price_poller": self.price_poller.stats() if self.price_poller is not None else None,
+            "http_single_flight": self.http_flights.stats(),
+            "rate_limits": self.rate_limits.stats(),
+            "tools": self.tools.stats()
+        }
+        return self.encoder.encode(result, arguments)
 
 async def main():
-    """Main entry point for the MCP server."""
+    """Main entry point for the MCP server (stdio transport)."""
+    from mcp.server.stdio import stdio_server
+    
     server_instance = SolanaMCPServer()
+    server_instance.start()
     
     # Run the server
-    async with stdio_server() as (read_stream, write_stream):
-        await server_instance.server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="solana-mcp-server",
-                server_version="1.0.0",
-                capabilities=server_instance.server.get_capabilities(
-                    notification_options=None,
-                    experimental_capabilities=None,
-                ),
-            ),
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server_instance.server.run(
+                read_stream,
+                write_stream,
+                server_instance.initialization_options(),
+            )
+    finally:
+        await server_instance.close()
+
+async def measure_startup() -> Dict[str, Any]:
+    """
+    Measure cold-start cost: module imports, server construction and the first tool listing.
+
+    Returns:
+        Dict[str, Any]: Durations in milliseconds and the number of enabled tools
+    """
+    from mcp.types import ListToolsRequest
+    
+    started = time.perf_counter()
+    server_instance = SolanaMCPServer()
+    initialized = time.perf_counter()
+    await server_instance.server.request_handlers[ListToolsRequest](ListToolsRequest(method="tools/list"))
+    listed = time.perf_counter()
+    await server_instance.close()
+    return {
+        "imports_ms": round((_IMPORTS_FINISHED - _IMPORT_STARTED) * 1000, 1),
+        "init_ms": round((initialized - started) * 1000, 1),
+        "first_list_tools_ms": round((listed - initialized) * 1000, 1),
+        "tools": len(server_instance.tools)
+    }
+
+def run(argv: Optional[Sequence[str]] = None):
+    """
+    Run the server with the transport selected on the command line or in the environment.
+
+    Args:
+        argv: Command line arguments (default: ``sys.argv[1:]``)
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Solana MCP Server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default=app_config.server_transport,
+                        help="stdio for a single client, http for streamable HTTP and SSE clients")
+    parser.add_argument("--host", default=app_config.server_host, help="HTTP bind address")
+    parser.add_argument("--port", type=int, default=app_config.server_port, help="HTTP port")
+    parser.add_argument("--workers", type=int, default=app_config.server_workers,
+                        help="HTTP worker processes sharing the listening socket")
+    parser.add_argument("--measure-startup", action="store_true",
+                        help="Report import and initialization time, then exit")
+    args = parser.parse_args(argv)
+    
+    if args.measure_startup:
+        print(ResponseEncoder().dumps(asyncio.run(measure_startup()), pretty=True))
+    elif args.transport == "http":
+        from http_transport import serve_http
+        serve_http(args.host, args.port, args.workers)
+    else:
+        asyncio.run(main())
 
 if __name__ == "__main__":
-    import base58
-    asyncio.run(main())
\ No newline at end of file
+    run()
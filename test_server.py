@@ -4,19 +4,52 @@ Test script for Solana MCP Server functionality.
 """
 
 import asyncio
+import base64
 import json
 import os
-from typing import Dict, Any
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List, Optional
 
-from solana_mcp_server import SolanaMCPServer
-from utils import validate_solana_address, lamports_to_sol, get_token_mint_address
-from config import config
+import httpx
+import websockets
+
+# Test environment; config is read when it is imported, so this must come first.
+# The test databases are kept out of the user's cache directory.
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="solana-mcp-test-")
+os.environ.setdefault("DEFAULT_NETWORK", "devnet")
+os.environ.setdefault("ENABLE_MARKET_DATA", "true")
+os.environ.setdefault("TX_STORE_PATH", os.path.join(TEST_DATA_DIR, "transactions.db"))
+os.environ.setdefault("MINT_REGISTRY_PATH", os.path.join(TEST_DATA_DIR, "mints.db"))
+
+from solana_mcp_server import SolanaMCPServer, measure_startup
+from utils import validate_solana_address, lamports_to_sol, get_token_mint_address, is_numpy_available
+from config import NetworkConfig, config
+from mint_registry import MintRegistry
+from price_service import PriceService
+from quote_router import gather_quotes
+from rate_limiter import RateLimiterRegistry, TokenBucket
+from rpc_batch import JSONRPCBatcher
+from rpc_cache import SlotCache, make_key
+from rpc_pool import NetworkClientPool
+from rpc_router import RPCRouter
+from token_decoder import ACCOUNT_LAYOUT, MINT_LAYOUT, TOKEN_PROGRAM_ID, VECTORIZE_THRESHOLD, decode_token_account, sum_amounts_by_mint
+from ws_subscriptions import SubscriptionManager
+from solders.pubkey import Pubkey
 
 class MCPServerTester:
     """Test class for MCP server functionality."""
     
     def __init__(self):
         self.server = SolanaMCPServer()
+        self.failures: List[str] = []
+    
+    def _fail(self, test: str, error: Exception):
+        """Report a failed offline check; any of these fails the run."""
+        self.failures.append(test)
+        print(f"❌ Error: {type(error).__name__}: {error}")
     
     async def test_get_balance(self, address: str = "11111111111111111111111111111111"):
         """Test getting SOL balance."""
@@ -63,6 +96,746 @@ class MCPServerTester:
         except Exception as e:
             print(f"❌ Error: {e}")
     
+    async def test_rpc_pool(self):
+        """Test pooled RPC clients across networks."""
+        print(f"\n🔍 Testing RPC pool")
+        
+        try:
+            for network in ["devnet", "testnet"]:
+                async with self.server.rpc_pool.client(network) as client:
+                    assert client is self.server.rpc_pool.get(network).client
+            stats = self.server.rpc_pool.stats()
+            print(f"✅ Open pools: {list(stats.keys())}")
+            for network, pool_stats in stats.items():
+                print(f"   {network}: acquired={pool_stats['acquired']} avg_wait_ms={pool_stats['avg_wait_ms']}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_concurrent_balances(self, addresses: List[str]):
+        """Test that concurrent balance lookups are coalesced into batches."""
+        print(f"\n🔍 Testing concurrent get_balance for {len(addresses)} addresses")
+        
+        try:
+            results = await asyncio.gather(*(self.server._get_balance({"address": addr}) for addr in addresses))
+            print(f"✅ Received {len(results)} results")
+            stats = self.server.rpc_pool.get().stats()
+            fan_in = stats["account_fan_in"]
+            print(f"   {fan_in['lookups']} account lookups merged into {fan_in['rpc_calls']} getMultipleAccounts calls")
+            print(f"   {stats['batching']['requests']} RPC calls sent in {stats['batching']['http_requests']} HTTP requests")
+            print(f"   {stats['single_flight']['shared']} of {stats['single_flight']['calls']} calls shared an in-flight request")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_batch_hedging(self):
+        """Test that batches carrying a transaction are never hedged (offline)."""
+        print(f"\n🔍 Testing batch hedging with non-idempotent calls")
+        
+        try:
+            posts = []
+            
+            async def post(payload, hedge=False):
+                posts.append(hedge)
+                return [{"jsonrpc": "2.0", "id": call["id"], "result": None} for call in payload]
+            
+            batcher = JSONRPCBatcher(post, window=0.01)
+            await asyncio.gather(
+                batcher.request("getBalance", ["11111111111111111111111111111111"], hedge=True),
+                batcher.request("sendTransaction", ["AAAA"])
+            )
+            await asyncio.gather(
+                batcher.request("getBalance", ["11111111111111111111111111111111"], hedge=True),
+                batcher.request("getSlot", [], hedge=False)
+            )
+            assert posts == [False, True], posts
+            print(f"✅ Batch with sendTransaction sent unhedged, read-only batch hedged")
+        except Exception as e:
+            self._fail("test_batch_hedging", e)
+    
+    def _mock_chain(self, latencies: Dict[str, float], behind: Optional[Dict[str, int]] = None) -> httpx.MockTransport:
+        """
+        Mock RPC endpoints serving a chain that advances one slot every 400ms.
+        
+        Endpoints are in sync unless listed in ``behind`` (host to slots behind);
+        finalized trails confirmed by 32 slots like on a real cluster.
+        ``latencies`` maps host to response delay and may be changed while
+        the transport is in use.
+        """
+        genesis = time.monotonic()
+        behind = behind or {}
+        
+        def slot(host: str, commitment: str) -> int:
+            confirmed = 1000 + int((time.monotonic() - genesis) / 0.4) - behind.get(host, 0)
+            return {"processed": confirmed + 1, "confirmed": confirmed}.get(commitment, confirmed - 32)
+        
+        def answer(host: str, call: Dict[str, Any]) -> Dict[str, Any]:
+            params = call.get("params") or []
+            options = params[-1] if params and isinstance(params[-1], dict) else {}
+            commitment = options.get("commitment", "finalized")
+            if call["method"] == "getSlot":
+                result = slot(host, commitment)
+            else:
+                result = {"context": {"slot": slot(host, commitment)}, "value": 1}
+            return {"jsonrpc": "2.0", "id": call["id"], "result": result}
+        
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(latencies.get(request.url.host, 0))
+            body = json.loads(request.content)
+            host = request.url.host
+            if isinstance(body, list):
+                return httpx.Response(200, json=[answer(host, call) for call in body])
+            return httpx.Response(200, json=answer(host, body))
+        
+        return httpx.MockTransport(handler)
+    
+    async def test_router_slot_lag(self):
+        """Test that idle, in-sync endpoints are not reported as lagging (offline)."""
+        print(f"\n🔍 Testing RPC router slot lag")
+        
+        try:
+            transport = self._mock_chain({"primary": 0.002, "idle": 0.03, "stale": 0.002}, behind={"stale": 20})
+            async with httpx.AsyncClient(transport=transport) as session:
+                router = RPCRouter(session, ["http://primary", "http://idle", "http://stale"], health_interval=0.05)
+                # All traffic goes to the primary; the idle endpoint only sees probes
+                payload = {"jsonrpc": "2.0", "id": 1, "method": "getBalance",
+                           "params": ["11111111111111111111111111111111", {"commitment": "confirmed"}]}
+                await router.probe()
+                deadline = time.monotonic() + 1.5
+                while time.monotonic() < deadline:
+                    await router.post(payload)
+                    await asyncio.sleep(0.01)
+                health = {entry["url"]: entry for entry in router.health()}
+                await router.close()
+            
+            assert health["http://primary"]["requests"] > health["http://idle"]["requests"] > 1
+            for url in ["http://primary", "http://idle"]:
+                assert health[url]["healthy"] and health[url]["slot_lag"] <= 1, health[url]
+            assert not health["http://stale"]["healthy"] and health["http://stale"]["slot_lag"] >= 19
+            print(f"✅ In-sync endpoints healthy, lag {health['http://idle']['slot_lag']}; "
+                  f"stale endpoint {health['http://stale']['slot_lag']} slots behind")
+        except Exception as e:
+            self._fail("test_router_slot_lag", e)
+    
+    async def test_router_hedging(self):
+        """Test that hedging fires with the real probe and traffic pattern (offline)."""
+        print(f"\n🔍 Testing RPC router hedging")
+        
+        try:
+            latencies = {"primary": 0.002, "secondary": 0.02}
+            transport = self._mock_chain(latencies)
+            async with httpx.AsyncClient(transport=transport) as session:
+                router = RPCRouter(
+                    session, ["http://primary", "http://secondary"],
+                    health_interval=0.05, hedge_budget=1.0, hedge_delay=0.05
+                )
+                payload = {"jsonrpc": "2.0", "id": 1, "method": "getBalance",
+                           "params": ["11111111111111111111111111111111", {"commitment": "confirmed"}]}
+                # Warm up: traffic on the primary while probes sample both endpoints
+                for _ in range(40):
+                    await router.post(payload)
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.1)
+                
+                # The primary stalls; hedged reads should be answered by the secondary
+                latencies["primary"] = 0.5
+                started = time.perf_counter()
+                body = await router.post(payload, hedge=True)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                stats = router.hedge_stats()
+                await router.close()
+            
+            assert body["result"]["value"] == 1
+            assert stats["hedged"] == 1 and stats["secondary_wins"] == 1, stats
+            assert elapsed_ms < 300, elapsed_ms
+            print(f"✅ Hedged request answered by the secondary in {elapsed_ms:.0f}ms")
+        except Exception as e:
+            self._fail("test_router_hedging", e)
+    
+    async def test_router_failover(self):
+        """Test that a failing primary is skipped in favour of the next endpoint (offline)."""
+        print(f"\n🔍 Testing RPC router failover")
+        
+        try:
+            hits = {"primary": 0, "secondary": 0}
+            
+            async def handler(request: httpx.Request) -> httpx.Response:
+                host = request.url.host
+                hits[host] += 1
+                if host == "primary":
+                    return httpx.Response(503)
+                body = json.loads(request.content)
+                return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": host})
+            
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as session:
+                router = RPCRouter(session, ["http://primary", "http://secondary"], health_interval=0)
+                payload = {"jsonrpc": "2.0", "id": 1, "method": "getSlot", "params": []}
+                first = await router.post(payload)
+                second = await router.post(payload)
+                ranked = [endpoint.url for endpoint in router.ranked()]
+                health = {entry["url"]: entry for entry in router.health()}
+                await router.close()
+            
+            assert first["result"] == second["result"] == "secondary"
+            assert router.failovers == 1 and hits == {"primary": 1, "secondary": 2}, (router.failovers, hits)
+            assert ranked == ["http://secondary", "http://primary"] and not health["http://primary"]["healthy"]
+            print(f"✅ Failed over once, primary cooling down and ranked last")
+            
+            # A malformed response is a bug to surface, not a reason to fail over (hedged or not)
+            hits = {"primary": 0, "secondary": 0}
+            
+            async def malformed(request: httpx.Request) -> httpx.Response:
+                hits[request.url.host] += 1
+                return httpx.Response(200, content=b"not json")
+            
+            async with httpx.AsyncClient(transport=httpx.MockTransport(malformed)) as session:
+                router = RPCRouter(session, ["http://primary", "http://secondary"], health_interval=0, hedge_budget=1.0)
+                for hedge in (True, False):
+                    try:
+                        await router.post(payload, hedge=hedge)
+                        raise AssertionError("malformed response was not raised")
+                    except ValueError:
+                        pass
+                await router.close()
+            
+            assert hits == {"primary": 2, "secondary": 0} and router.failovers == 0, (hits, router.failovers)
+            print(f"✅ Malformed responses raised without failing over")
+        except Exception as e:
+            self._fail("test_router_failover", e)
+    
+    async def test_rate_limits(self):
+        """Test the token bucket rate and Retry-After handling on 429 responses (offline)."""
+        print(f"\n🔍 Testing rate limiting")
+        
+        try:
+            bucket = TokenBucket(600, burst=5)
+            started = time.monotonic()
+            for _ in range(15):
+                await bucket.acquire()
+            elapsed = time.monotonic() - started
+            # 5 burst tokens, then 10 more at 10 per second
+            assert 0.9 <= elapsed < 1.4, elapsed
+            
+            # After a pause the bucket refills from zero instead of releasing a burst
+            bucket = TokenBucket(600, burst=5)
+            paused = time.monotonic()
+            bucket.pause(0.3)
+            resumed = []
+            for _ in range(3):
+                await bucket.acquire()
+                resumed.append(time.monotonic() - paused)
+            assert resumed[0] >= 0.39 and resumed[2] - resumed[0] >= 0.18, resumed
+            
+            sent = []
+            
+            async def handler(request: httpx.Request) -> httpx.Response:
+                sent.append(time.monotonic())
+                if len(sent) == 1:
+                    return httpx.Response(429, headers={"Retry-After": "0.3"})
+                body = json.loads(request.content)
+                return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": 1})
+            
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as session:
+                limiter = RateLimiterRegistry(0)
+                router = RPCRouter(session, ["http://mock"], health_interval=0, limiter=limiter)
+                body = await router.post({"jsonrpc": "2.0", "id": 1, "method": "getSlot", "params": []})
+                await router.close()
+            
+            assert body["result"] == 1 and len(sent) == 2
+            assert sent[1] - sent[0] >= 0.3, sent[1] - sent[0]
+            print(f"✅ 15 tokens at 600/min took {elapsed:.2f}s, first token {resumed[0]:.2f}s after a 0.3s pause; "
+                  f"RPC retry after 429 waited {sent[1] - sent[0]:.2f}s")
+        except Exception as e:
+            self._fail("test_rate_limits", e)
+        
+        server = SolanaMCPServer()
+        try:
+            sent = []
+            
+            async def handler(request: httpx.Request) -> httpx.Response:
+                sent.append(time.monotonic())
+                if len(sent) == 1:
+                    return httpx.Response(429, headers={"Retry-After": "0.2"})
+                return httpx.Response(200, json={"solana": {"usd": 150.0}})
+            
+            server._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            response = await server._http_get(f"{config.coingecko_api_url}/simple/price", {"ids": "solana"})
+            # The retry waits out Retry-After, then for a token at the CoinGecko rate
+            bucket = server.rate_limits.get("coingecko")
+            expected = 0.2 + (1 / bucket.rate if bucket.enabled else 0)
+            assert response.status_code == 200 and len(sent) == 2
+            assert expected - 0.05 <= sent[1] - sent[0] < expected + 0.3, (sent[1] - sent[0], expected)
+            print(f"✅ External API retry after 429 waited {sent[1] - sent[0]:.2f}s (expected {expected:.2f}s)")
+        except Exception as e:
+            self._fail("test_rate_limits", e)
+        finally:
+            await server.close()
+    
+    async def test_price_coalescing(self):
+        """Test that concurrent price lookups share one request and are then cached (offline)."""
+        print(f"\n🔍 Testing price request coalescing")
+        
+        try:
+            requests = []
+            
+            async def handler(request: httpx.Request) -> httpx.Response:
+                ids = request.url.params["ids"].split(",")
+                requests.append(ids)
+                return httpx.Response(200, json={name: {"usd": 1.0, "usd_24h_change": 0.5} for name in ids})
+            
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                prices = PriceService(
+                    lambda url, params: client.get(url, params=params),
+                    "http://prices", resolve_mint=lambda token: None, window=0.01
+                )
+                quotes = await asyncio.gather(*(prices.get_price(token) for token in ["SOL", "USDC", "JUP", "SOL"]))
+                again = await prices.get_price("usdc")
+                stats = prices.stats()
+                
+                # A cancelled caller must not cancel the lookup it shares with others
+                cancelled = asyncio.create_task(prices.get_price("BONK"))
+                survivor = asyncio.create_task(prices.get_price("bonk"))
+                await asyncio.sleep(0)
+                cancelled.cancel()
+                shared = await survivor
+            
+            assert all(quote is not None and quote.price_usd == 1.0 for quote in quotes)
+            assert sorted(requests[0]) == ["jupiter-exchange-solana", "solana", "usd-coin"], requests
+            assert again is quotes[1] and stats["requests"] == 1 and stats["hits"] >= 1, stats
+            assert cancelled.cancelled() and shared is not None and requests[1:] == [["bonk"]], requests
+            print(f"✅ {stats['lookups']} lookups served by {stats['requests']} request")
+        except Exception as e:
+            self._fail("test_price_coalescing", e)
+    
+    async def test_bulk_fan_out(self):
+        """Test that bulk account chunks are parallel HTTP requests, not one batch (offline)."""
+        print(f"\n🔍 Testing bulk getMultipleAccounts fan-out")
+        
+        try:
+            in_flight = 0
+            peak = 0
+            posts = []
+            
+            async def handler(request: httpx.Request) -> httpx.Response:
+                nonlocal in_flight, peak
+                body = json.loads(request.content)
+                posts.append(body)
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.02)
+                in_flight -= 1
+                keys = body["params"][0]
+                return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": {
+                    "context": {"slot": 1}, "value": [{"lamports": 1} for _ in keys]
+                }})
+            
+            pool = NetworkClientPool(
+                NetworkConfig("mock", "http://mock"), "confirmed",
+                max_concurrent_chunks=8, ws_subscriptions=False, transport=httpx.MockTransport(handler)
+            )
+            addresses = [str(Pubkey.from_bytes(index.to_bytes(32, "little"))) for index in range(2000)]
+            result = await pool.get_lamports(addresses, "confirmed")
+            await pool.close()
+            
+            assert result["lamports"] == [1] * 2000
+            assert len(posts) == 20 and all(isinstance(body, dict) for body in posts)
+            assert peak == 8, peak
+            print(f"✅ {len(posts)} chunks sent as single requests, {peak} in flight at once")
+        except Exception as e:
+            self._fail("test_bulk_fan_out", e)
+    
+    async def test_get_multiple_accounts(self, addresses: List[str]):
+        """Test looking up many accounts in one tool call."""
+        print(f"\n🔍 Testing get_multiple_accounts for {len(addresses)} addresses")
+        
+        try:
+            result = await self.server._get_multiple_accounts({"addresses": addresses})
+            print(f"✅ Result: {result[0].text[:200]}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_get_balances(self, addresses: List[str]):
+        """Test looking up many balances in one tool call."""
+        print(f"\n🔍 Testing get_balances for {len(addresses)} addresses")
+        
+        try:
+            result = await self.server._get_balances({"addresses": addresses})
+            print(f"✅ Result: {result[0].text[:200]}")
+            fan_in = self.server.rpc_pool.get().stats()["account_fan_in"]
+            print(f"   Fan-in: lookups={fan_in['lookups']} rpc_calls={fan_in['rpc_calls']}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_get_swap_quote(self, input_mint: str, output_mint: str, amount: int):
+        """Test that repeated swap quotes are served from the quote cache."""
+        print(f"\n🔍 Testing get_swap_quote {input_mint} -> {output_mint}")
+        
+        try:
+            for _ in range(2):
+                result = await self.server._get_swap_quote({
+                    "input_mint": input_mint,
+                    "output_mint": output_mint,
+                    "amount": amount
+                })
+            print(f"✅ Result: {result[0].text[:200]}")
+            quotes = self.server.quotes.stats()
+            print(f"   Quote cache: hits={quotes['hits']} misses={quotes['misses']}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_best_execution_quotes(self):
+        """Test that best-execution quotes are cached apart and slow candidates aborted (offline)."""
+        print("\n🔍 Testing best-execution quote caching")
+        
+        server = SolanaMCPServer()
+        budget_ms = config.swap_quote_budget_ms
+        try:
+            requests = []
+            aborted = []
+            
+            async def handler(request: httpx.Request) -> httpx.Response:
+                params = dict(request.url.params)
+                requests.append(params)
+                try:
+                    if params.get("onlyDirectRoutes") == "true":
+                        await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    aborted.append(params)
+                    raise
+                out = 1100 if params.get("restrictIntermediateTokens") == "true" else 1000
+                return httpx.Response(200, json={"inAmount": params["amount"], "outAmount": str(out)})
+            
+            server._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            config.swap_quote_budget_ms = 100
+            sol, usdc = get_token_mint_address("SOL"), get_token_mint_address("USDC")
+            
+            standard, cached, _ = await server._get_quote(sol, usdc, 1_000_000, 50)
+            best, cached, candidates = await server._get_quote(sol, usdc, 1_000_000, 50, best_execution=True)
+            await asyncio.sleep(0.05)  # let the cancelled candidate unwind
+            assert not cached and best.quote["outAmount"] == "1100" and standard.quote["outAmount"] == "1000"
+            assert len(candidates) == 2 and len(aborted) == 1, (candidates, aborted)
+            
+            again, cached, _ = await server._get_quote(sol, usdc, 1_000_000, 50, best_execution=True)
+            assert cached and again is best
+            print(f"✅ Best execution bypassed the single-route quote; {len(aborted)} slow candidate aborted")
+        except Exception as e:
+            self._fail("test_best_execution_quotes", e)
+        finally:
+            config.swap_quote_budget_ms = budget_ms
+            await server.close()
+    
+    async def test_quote_cancellation(self):
+        """Test that cancelling a best-execution lookup cancels its candidate requests (offline)."""
+        print("\n🔍 Testing quote candidate cancellation")
+        
+        try:
+            started = []
+            aborted = []
+            
+            async def fetch(source, params):
+                started.append(source)
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    aborted.append(source)
+                    raise
+            
+            lookup = asyncio.create_task(gather_quotes(fetch, ["http://a", "http://b"], budget=0.05))
+            await asyncio.sleep(0.1)  # past the budget, still waiting for a first quote
+            lookup.cancel()
+            await asyncio.sleep(0.01)
+            assert lookup.cancelled() and len(started) > 0 and sorted(aborted) == sorted(started), (started, aborted)
+            print(f"✅ All {len(aborted)} candidate requests cancelled with the caller")
+        except Exception as e:
+            self._fail("test_quote_cancellation", e)
+    
+    async def test_swap_execution_guard(self):
+        """Test that local swap execution is refused without the required opt-ins."""
+        print("\n🔍 Testing swap execution guard")
+        
+        try:
+            refusal = await self.server._check_swap_execution({
+                "input_mint": "So11111111111111111111111111111111111111112",
+                "output_mint": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",
+                "amount": 1_000_000,
+                "user_public_key": "11111111111111111111111111111111",
+                "execute": True
+            })
+            if refusal:
+                print(f"✅ Refused: {refusal}")
+            else:
+                print("❌ Execution was allowed without confirmation")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_get_portfolio(self, address: str):
+        """Test fetching all token holdings of an address."""
+        print(f"\n🔍 Testing get_portfolio for address: {address}")
+        
+        try:
+            result = await self.server._get_portfolio({"address": address})
+            print(f"✅ Result: {result[0].text[:200]}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_cached_reads(self, address: str):
+        """Test that repeated reads are served from the slot cache."""
+        print(f"\n🔍 Testing cached get_balance for address: {address}")
+        
+        try:
+            for _ in range(3):
+                await self.server._get_balance({"address": address})
+            cache = self.server.rpc_pool.get().stats()["cache"]
+            print(f"✅ Cache hits={cache['hits']} misses={cache['misses']} entries={cache['entries']}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_slot_cache_commitments(self):
+        """Test that slot age is measured per commitment level (offline)."""
+        print(f"\n🔍 Testing slot cache expiry per commitment")
+        
+        try:
+            cache = SlotCache(ttls={"confirmed": 2.0, "finalized": 30.0})
+            finalized = make_key("getAccountInfo", ["a"], "finalized")
+            confirmed = make_key("getAccountInfo", ["a"], "confirmed")
+            cache.put(finalized, {"context": {"slot": 1000}, "value": 1}, "finalized")
+            cache.put(confirmed, {"context": {"slot": 1032}, "value": 2}, "confirmed")
+            
+            # Processed and confirmed slots run ahead of finalized ones
+            cache.observe_slot(1045, "processed")
+            cache.observe_slot(1044, "confirmed")
+            assert cache.get(finalized) is not None
+            assert cache.get(confirmed) is None
+            
+            cache.observe_slot(1000 + 76, "finalized")
+            assert cache.get(finalized) is None
+            print(f"✅ Finalized entry outlived confirmed slots, expired by finalized slot age")
+        except Exception as e:
+            self._fail("test_slot_cache_commitments", e)
+    
+    async def test_transaction_store(self, signature: str):
+        """Test that repeated transaction lookups are served from the local store."""
+        print(f"\n🔍 Testing get_transaction for signature: {signature[:20]}...")
+        
+        try:
+            for _ in range(2):
+                result = await self.server._get_transaction({"signature": signature})
+            print(f"✅ Result: {result[0].text}")
+            store = self.server.tx_store.stats()
+            print(f"   Store: memory_hits={store['memory_hits']} disk_hits={store['disk_hits']} misses={store['misses']}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_transaction_round_trips(self):
+        """Test that uncached transactions cost one round-trip and only finalized ones are stored (offline)."""
+        print(f"\n🔍 Testing get_transaction round-trips")
+        
+        server = SolanaMCPServer()
+        commitment = server.config.commitment
+        try:
+            posts = []
+            statuses = {"final": "finalized", "recent": "confirmed"}
+            
+            def answer(call: Dict[str, Any]) -> Dict[str, Any]:
+                signature = call["params"][0]
+                if call["method"] == "getTransaction":
+                    result = {"slot": 1, "meta": {"err": None}} if signature in statuses else None
+                else:
+                    status = statuses.get(signature[0])
+                    result = {"context": {"slot": 2}, "value": [{"confirmationStatus": status} if status else None]}
+                return {"jsonrpc": "2.0", "id": call["id"], "result": result}
+            
+            async def handler(request: httpx.Request) -> httpx.Response:
+                body = json.loads(request.content)
+                posts.append(body)
+                if isinstance(body, list):
+                    return httpx.Response(200, json=[answer(call) for call in body])
+                return httpx.Response(200, json=answer(body))
+            
+            network = config.current_network
+            server.rpc_pool._pools[network] = NetworkClientPool(
+                NetworkConfig(network, "http://mock"), "confirmed",
+                ws_subscriptions=False, transport=httpx.MockTransport(handler)
+            )
+            server.config.commitment = "confirmed"
+            
+            for signature in ["final", "recent", "missing", "final", "recent"]:
+                await server._fetch_transaction(signature)
+            stored = server.tx_store.stats()
+            assert len(posts) == 4 and all(isinstance(body, list) and len(body) == 2 for body in posts), posts
+            assert stored["memory_hits"] + stored["disk_hits"] == 1, stored
+            print(f"✅ 5 lookups cost {len(posts)} round-trips; only the finalized transaction was stored")
+        except Exception as e:
+            self._fail("test_transaction_round_trips", e)
+        finally:
+            server.config.commitment = commitment
+            await server.close()
+    
+    async def test_rpc_health(self):
+        """Test RPC endpoint health reporting."""
+        print(f"\n🔍 Testing get_rpc_health")
+        
+        try:
+            result = await self.server._get_rpc_health({})
+            health = json.loads(result[0].text)
+            print(f"✅ {len(health['endpoints'])} endpoint(s) for {health['network']}")
+            for endpoint in health["endpoints"]:
+                print(f"   {endpoint['url']}: healthy={endpoint['healthy']} score={endpoint['score']}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_http_transport(self):
+        """Test the HTTP transport app: lifespan startup and the health route."""
+        print(f"\n🔍 Testing HTTP transport")
+        
+        try:
+            import httpx
+            from http_transport import create_app
+            
+            app = create_app()
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    response = await client.get("/health")
+            paths = [route.path for route in app.routes]
+            print(f"✅ /health: {response.status_code}, routes: {', '.join(paths)}")
+            
+            # The worker count passed to the factory wins over SERVER_WORKERS
+            single = [route.path for route in create_app(workers=1).routes]
+            multi = [route.path for route in create_app(workers=4).routes]
+            assert "/sse" in single and "/sse" not in multi, (single, multi)
+            print(f"✅ SSE served with 1 worker, disabled with 4")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_startup_side_effects(self):
+        """Test that measuring startup creates no databases (offline)."""
+        print(f"\n🔍 Testing startup measurement side effects")
+        
+        paths = (config.tx_store_path, config.mint_registry_path)
+        directory = tempfile.mkdtemp(prefix="solana-mcp-startup-")
+        try:
+            config.tx_store_path = os.path.join(directory, "transactions.db")
+            config.mint_registry_path = os.path.join(directory, "mints.db")
+            timings = await measure_startup()
+            assert os.listdir(directory) == [], os.listdir(directory)
+            print(f"✅ Startup measured ({timings['init_ms']}ms init) without creating files")
+        except Exception as e:
+            self._fail("test_startup_side_effects", e)
+        finally:
+            config.tx_store_path, config.mint_registry_path = paths
+            shutil.rmtree(directory, ignore_errors=True)
+    
+    async def test_tool_registry(self):
+        """Test tool listing and argument validation through the tool registry."""
+        print(f"\n🔍 Testing tool registry")
+        
+        try:
+            tools = self.server.tools
+            print(f"✅ {len(tools)} tools enabled, disabled: {list(tools.disabled) or 'none'}")
+            error = tools.get("get_balance").validate({"address": 123})
+            print(f"   get_balance with a numeric address: {error}")
+            schema_errors = tools.check_schemas()
+            print(f"   Invalid schemas: {schema_errors or 'none'}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_response_encoder(self):
+        """Test compact and pretty response encoding."""
+        print(f"\n🔍 Testing response encoder ({self.server.encoder.backend})")
+        
+        try:
+            compact = await self.server._get_server_stats({})
+            pretty = await self.server._get_server_stats({"pretty": True})
+            assert json.loads(compact[0].text).keys() == json.loads(pretty[0].text).keys()
+            print(f"✅ get_server_stats: {len(compact[0].text)} bytes compact, {len(pretty[0].text)} bytes pretty")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_account_watch(self, address: str):
+        """Test watching an account over the network's WebSocket subscription."""
+        print(f"\n🔍 Testing account watch for {address[:8]}...")
+        
+        try:
+            result = await self.server._watch_account({"address": address})
+            print(f"   watch_account: {result[0].text}")
+            await asyncio.sleep(2)
+            
+            # While the subscription is active, balance reads are served from the cache
+            await self.server._get_balance({"address": address})
+            subscriptions = self.server.rpc_pool.get().stats()["subscriptions"]
+            cache = self.server.rpc_pool.get().cache.stats()
+            if subscriptions is not None:
+                print(f"   connected: {subscriptions['connected']}, subscriptions: {len(subscriptions['subscriptions'])}")
+            print(f"   pinned: {cache['pinned']}, pinned hits: {cache['pinned_hits']}")
+            
+            result = await self.server._unwatch_account({"address": address})
+            print(f"✅ unwatch_account: {result[0].text}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_ws_resubscription(self):
+        """Test that live subscriptions are restored after a reconnect and one-shots are not (offline)."""
+        print(f"\n🔍 Testing WebSocket re-subscription")
+        
+        manager = None
+        try:
+            connections = []
+            subscribed = []
+            
+            async def handler(ws, path=None):
+                connections.append(ws)
+                async for message in ws:
+                    call = json.loads(message)
+                    if call["method"].endswith("Unsubscribe"):
+                        result = True
+                    else:
+                        result = len(subscribed) + 1
+                        subscribed.append((len(connections), call["method"], result))
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "id": call["id"], "result": result}))
+            
+            async def wait_until(condition, timeout=2.0):
+                deadline = time.monotonic() + timeout
+                while not condition():
+                    assert time.monotonic() < deadline, "timed out"
+                    await asyncio.sleep(0.01)
+            
+            def notify(ws, method, server_id, result):
+                params = {"subscription": server_id, "result": result}
+                return ws.send(json.dumps({"jsonrpc": "2.0", "method": method, "params": params}))
+            
+            async with websockets.serve(handler, "127.0.0.1", 0) as ws_server:
+                port = ws_server.sockets[0].getsockname()[1]
+                manager = SubscriptionManager(f"ws://127.0.0.1:{port}", reconnect_delay=0.05)
+                states = []
+                received = []
+                address = "11111111111111111111111111111111"
+                await manager.subscribe("accountSubscribe", [address], received.append, states.append)
+                await manager.subscribe("slotSubscribe", [], received.append)
+                await manager.subscribe("signatureSubscribe", ["sig"], received.append)
+                await wait_until(lambda: len(subscribed) == 3 and states == [True])
+                
+                ids = {method: server_id for _, method, server_id in subscribed}
+                await notify(connections[0], "signatureNotification", ids["signatureSubscribe"], {"err": None})
+                await wait_until(lambda: len(received) == 1)
+                await connections[0].close()
+                await wait_until(lambda: len(subscribed) == 5 and states == [True, False, True])
+                
+                resubscribed = {method: server_id for index, method, server_id in subscribed if index == 2}
+                await notify(connections[1], "accountNotification", resubscribed["accountSubscribe"], {"lamports": 1})
+                await notify(connections[1], "slotNotification", resubscribed["slotSubscribe"], {"slot": 2})
+                await wait_until(lambda: len(received) == 3)
+                stats = manager.stats()
+                await manager.close()
+            
+            assert set(resubscribed) == {"accountSubscribe", "slotSubscribe"}, resubscribed
+            assert received == [{"err": None}, {"lamports": 1}, {"slot": 2}], received
+            assert stats["connects"] == 2 and len(stats["subscriptions"]) == 2
+            print(f"✅ Re-subscribed {sorted(resubscribed)} after reconnect; fired signature subscription dropped")
+        except Exception as e:
+            self._fail("test_ws_resubscription", e)
+        finally:
+            if manager is not None:
+                await manager.close()
+    
     async def test_address_validation(self):
         """Test address validation utilities."""
         print(f"\n🔍 Testing address validation")
@@ -97,6 +870,99 @@ class MCPServerTester:
         sol = lamports_to_sol(lamports)
         print(f"   {lamports} lamports = {sol} SOL")
     
+    async def test_mint_registry(self, symbol: str):
+        """Test loading mint metadata through the registry."""
+        print(f"\n🔍 Testing mint registry for {symbol}")
+        
+        try:
+            mint = self.server.mints.resolve(symbol)
+            info = await self.server.mints.get(mint)
+            await self.server.mints.get(mint)
+            stats = self.server.mints.stats()
+            print(f"✅ {mint}: decimals={info.decimals if info else None}")
+            print(f"   Registry: hits={stats['hits']} misses={stats['misses']} rpc_loads={stats['rpc_loads']}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_mint_registry_rejects_token_accounts(self):
+        """Test that token accounts owned by the token program are not indexed as mints (offline)."""
+        print(f"\n🔍 Testing mint registry with a token account")
+        
+        registry = None
+        try:
+            empty = bytes(32)
+            owner = bytes(Pubkey.from_string("11111111111111111111111111111111"))
+            accounts = {
+                "mint": MINT_LAYOUT.pack(0, empty, 1_000_000, 6, 1, 0, empty),
+                "token_account": ACCOUNT_LAYOUT.pack(empty, owner, 5, 0, empty, 1, 0, 0, 0, 0, empty),
+                "uninitialized": MINT_LAYOUT.pack(0, empty, 0, 0, 0, 0, empty),
+            }
+            
+            class Pool:
+                async def get_accounts(self, addresses, commitment):
+                    return [{"value": {"owner": TOKEN_PROGRAM_ID,
+                                       "data": [base64.b64encode(accounts[address]).decode(), "base64"]}}
+                            for address in addresses]
+            
+            class Pools:
+                def get(self, network):
+                    return Pool()
+            
+            registry = MintRegistry(Pools(), None, refresh_interval=0)
+            found = await registry.get_many(list(accounts), "mainnet")
+            assert list(found) == ["mint"] and found["mint"].decimals == 6, found
+            print(f"✅ Token account and uninitialized mint skipped, real mint indexed")
+        except Exception as e:
+            self._fail("test_mint_registry_rejects_token_accounts", e)
+        finally:
+            if registry is not None:
+                await registry.close()
+    
+    async def test_token_decoder(self):
+        """Test decoding raw SPL token account data."""
+        print(f"\n🔍 Testing token account decoding")
+        
+        try:
+            mint = bytes(Pubkey.from_string(get_token_mint_address("USDC")))
+            owner = bytes(Pubkey.from_string("11111111111111111111111111111111"))
+            empty = bytes(32)
+            data = [
+                ACCOUNT_LAYOUT.pack(mint, owner, amount, 0, empty, 1, 0, 0, 0, 0, empty)
+                for amount in range(1, 1001)
+            ]
+            account = decode_token_account(data[41])
+            totals = sum_amounts_by_mint(data)
+            print(f"✅ amount={account.amount} mint={account.mint[:8]}... total={totals[account.mint]}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    async def test_token_decoder_benchmark(self):
+        """Compare the loop and NumPy paths of sum_amounts_by_mint (sets VECTORIZE_THRESHOLD)."""
+        print(f"\n🔍 Benchmarking sum_amounts_by_mint")
+        
+        if not is_numpy_available():
+            print("   NumPy is not installed; only the loop is used")
+            return
+        try:
+            empty = bytes(32)
+            mints = [bytes([index]) * 32 for index in range(1, 51)]
+            for count in (16, 64, 500, 5000):
+                data = [
+                    ACCOUNT_LAYOUT.pack(mints[index % len(mints)], empty, index, 0, empty, 1, 0, 0, 0, 0, empty)
+                    for index in range(count)
+                ]
+                timings = {}
+                for vectorize in (False, True):
+                    started = time.perf_counter()
+                    for _ in range(20):
+                        totals = sum_amounts_by_mint(data, vectorize=vectorize)
+                    timings[vectorize] = (time.perf_counter() - started) / 20 * 1000
+                    assert totals == sum_amounts_by_mint(data, vectorize=False)
+                print(f"   {count} accounts: loop {timings[False]:.3f}ms, numpy {timings[True]:.3f}ms")
+            print(f"✅ Vectorized above {VECTORIZE_THRESHOLD} accounts")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
     async def run_all_tests(self):
         """Run all tests."""
         print("🚀 Starting Solana MCP Server Tests")
@@ -118,6 +984,12 @@ class MCPServerTester:
         # Test utilities
         await self.test_address_validation()
         await self.test_token_utilities()
+        await self.test_token_decoder()
+        await self.test_token_decoder_benchmark()
+        await self.test_mint_registry("USDC")
+        await self.test_mint_registry_rejects_token_accounts()
+        
+        await self.test_rpc_pool()
         
         # Test wallet creation
         wallet = await self.test_create_wallet()
@@ -125,6 +997,51 @@ class MCPServerTester:
         # Test balance checking (using system program address as example)
         await self.test_get_balance("11111111111111111111111111111111")
         
+        # Test batched concurrent lookups
+        await self.test_concurrent_balances([
+            "11111111111111111111111111111111",
+            "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+            "ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL",
+            "SysvarRent111111111111111111111111111111111"
+        ])
+        
+        await self.test_cached_reads("11111111111111111111111111111111")
+        await self.test_slot_cache_commitments()
+        await self.test_batch_hedging()
+        await self.test_bulk_fan_out()
+        await self.test_router_slot_lag()
+        await self.test_router_hedging()
+        await self.test_router_failover()
+        await self.test_rate_limits()
+        await self.test_price_coalescing()
+        
+        await self.test_get_multiple_accounts([
+            "11111111111111111111111111111111",
+            "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+        ])
+        
+        await self.test_get_balances([
+            "11111111111111111111111111111111",
+            "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+            "SysvarRent111111111111111111111111111111111",
+            "not-an-address"
+        ])
+        
+        await self.test_get_portfolio("8sLbNZoA1cfnvMJLPfp98ZLAnFSYCFApfJKMbiXNLwxj")
+        
+        await self.test_transaction_store(
+            "5VERv8NMvzbJMEkV8xnrLkEaWRtSz9CosKDYjCJjBRnbJLgp8uirBgmQpjKhoR4tjF3ZpRzrFmBV6UjKdiSZkQUW"
+        )
+        
+        await self.test_transaction_round_trips()
+        await self.test_rpc_health()
+        await self.test_http_transport()
+        await self.test_tool_registry()
+        await self.test_startup_side_effects()
+        await self.test_response_encoder()
+        await self.test_account_watch("8sLbNZoA1cfnvMJLPfp98ZLAnFSYCFApfJKMbiXNLwxj")
+        await self.test_ws_resubscription()
+        
         # Test account info
         if wallet:
             await self.test_get_account_info(wallet["public_key"])
@@ -134,24 +1051,38 @@ class MCPServerTester:
             await self.test_get_token_price("sol")
             await self.test_get_token_price("usdc")
         
+        # Test swap quotes (if DeFi tools are enabled)
+        if config.enable_defi_tools:
+            await self.test_get_swap_quote("SOL", "USDC", 1_000_000_000)
+            await self.test_swap_execution_guard()
+        await self.test_best_execution_quotes()
+        await self.test_quote_cancellation()
+        
+        await self.server.close()
+        
         print("\n" + "=" * 50)
         print("🎉 Tests completed!")
 
-async def main():
-    """Main test function."""
+async def main() -> int:
+    """Main test function; returns the exit status."""
     tester = MCPServerTester()
     await tester.run_all_tests()
+    if tester.failures:
+        print(f"\n❌ {len(tester.failures)} offline check(s) failed: {', '.join(tester.failures)}")
+        return 1
+    return 0
 
 if __name__ == "__main__":
-    # Set up test environment
-    os.environ.setdefault("DEFAULT_NETWORK", "devnet")
-    os.environ.setdefault("ENABLE_MARKET_DATA", "true")
-    
     try:
-        asyncio.run(main())
+        status = asyncio.run(main())
     except KeyboardInterrupt:
         print("\n\nTests interrupted by user")
+        status = 130
     except Exception as e:
         print(f"\n\nTest error: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+        status = 1
+    finally:
+        shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
+    sys.exit(status)
\ No newline at end of file
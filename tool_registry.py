@@ -0,0 +1,174 @@
+"""
+Tool registry for the Solana MCP Server.
+
+Tool handlers declare their name, description and input schema once with
+the ``@tool`` decorator. At startup the registry binds the handlers of a
+server instance, builds the ``Tool`` definitions and compiles an argument
+validator per tool, so listing tools returns a prebuilt list and a call
+is a single dict lookup.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from jsonschema import SchemaError, ValidationError
+from jsonschema.validators import validator_for
+from mcp.types import Tool
+
+ToolHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+TOOL_SPEC_ATTRIBUTE = "__tool_spec__"
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Declaration of a tool, attached to its handler by ``@tool``."""
+    name: str
+    description: str
+    properties: Dict[str, Any] = field(default_factory=dict)
+    required: Tuple[str, ...] = ()
+    feature: Optional[str] = None
+
+    def input_schema(self, common_properties: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """JSON schema of the tool's arguments, including properties shared by all tools."""
+        return {
+            "type": "object",
+            "properties": {**self.properties, **(common_properties or {})},
+            "required": list(self.required)
+        }
+
+def tool(
+    name: str,
+    description: str,
+    properties: Optional[Dict[str, Any]] = None,
+    required: Sequence[str] = (),
+    feature: Optional[str] = None,
+):
+    """
+    Declare a method as the handler of an MCP tool.
+
+    Args:
+        name: Tool name
+        description: Tool description shown to clients
+        properties: JSON schema properties of the arguments
+        required: Names of required arguments
+        feature: Feature flag the tool depends on (e.g. "defi", "market_data")
+
+    Returns:
+        Decorator returning the method unchanged
+    """
+    spec = ToolSpec(name, description, properties or {}, tuple(required), feature)
+
+    def decorator(func):
+        setattr(func, TOOL_SPEC_ATTRIBUTE, spec)
+        return func
+
+    return decorator
+
+@dataclass(frozen=True)
+class RegisteredTool:
+    """A tool bound to a server instance."""
+    spec: ToolSpec
+    definition: Tool
+    handler: ToolHandler
+    validator: Any
+
+    def validate(self, arguments: Dict[str, Any]) -> Optional[str]:
+        """
+        Validate call arguments against the tool's schema.
+
+        Returns:
+            Optional[str]: Error message, or None if the arguments are valid
+        """
+        try:
+            self.validator.validate(arguments)
+        except ValidationError as e:
+            return e.message
+        return None
+
+class ToolRegistry:
+    """Tools of a server instance, compiled once at startup."""
+
+    def __init__(
+        self,
+        owner: Any,
+        features: Optional[Mapping[str, bool]] = None,
+        common_properties: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Collect and compile the tools declared on an object.
+
+        Args:
+            owner: Object whose ``@tool`` methods are registered
+            features: Feature flags; tools of disabled features are not registered
+            common_properties: Argument schema properties accepted by every tool
+        """
+        features = features or {}
+        self._tools: Dict[str, RegisteredTool] = {}
+        self.disabled: Tuple[str, ...] = ()
+
+        disabled = []
+        for spec, method_name in self._collect(type(owner)):
+            if spec.feature is not None and not features.get(spec.feature, True):
+                disabled.append(spec.name)
+                continue
+            schema = spec.input_schema(common_properties)
+            validator_class = validator_for(schema)
+            self._tools[spec.name] = RegisteredTool(
+                spec=spec,
+                definition=Tool(name=spec.name, description=spec.description, inputSchema=schema),
+                handler=getattr(owner, method_name),
+                validator=validator_class(schema),
+            )
+        self.disabled = tuple(disabled)
+        self._definitions: Tuple[Tool, ...] = tuple(registered.definition for registered in self._tools.values())
+
+    @staticmethod
+    def _collect(cls: type) -> List[Tuple[ToolSpec, str]]:
+        """Find ``@tool`` methods in declaration order, base classes first."""
+        found: Dict[str, Tuple[ToolSpec, str]] = {}
+        for klass in reversed(cls.__mro__):
+            for attribute, value in vars(klass).items():
+                spec = getattr(value, TOOL_SPEC_ATTRIBUTE, None)
+                if spec is not None:
+                    found[spec.name] = (spec, attribute)
+        return list(found.values())
+
+    @property
+    def definitions(self) -> Tuple[Tool, ...]:
+        """Prebuilt ``Tool`` definitions of the enabled tools."""
+        return self._definitions
+
+    def get(self, name: str) -> Optional[RegisteredTool]:
+        """Look up an enabled tool by name."""
+        return self._tools.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def check_schemas(self) -> Dict[str, str]:
+        """
+        Check every tool's input schema against its JSON Schema meta-schema.
+
+        Kept out of startup because meta-schema validation is far slower
+        than compiling the validators.
+
+        Returns:
+            Dict[str, str]: Error message per tool with an invalid schema
+        """
+        errors = {}
+        for name, registered in self._tools.items():
+            try:
+                type(registered.validator).check_schema(registered.definition.inputSchema)
+            except SchemaError as e:
+                errors[name] = e.message
+        return errors
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the enabled and disabled tool names."""
+        return {
+            "enabled": list(self._tools),
+            "disabled": list(self.disabled),
+        }
@@ -0,0 +1,162 @@
+"""
+Persistent store for finalized transactions.
+
+Finalized transactions never change, so their raw ``getTransaction``
+responses are kept forever in a local SQLite database keyed by network
+and signature, with an in-memory LRU in front for repeat lookups.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class TransactionStore:
+    """SQLite-backed transaction cache with an in-memory LRU front."""
+
+    def __init__(self, path: Optional[str], memory_size: int = 1024):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite database file (None or empty keeps transactions in memory only)
+            memory_size: Number of transactions kept in the in-memory LRU
+        """
+        self.path = os.path.expanduser(path) if path else None
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._opened = False
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stored = 0
+
+    def _ensure_open(self):
+        """Open the database on first use, so constructing the store touches no files."""
+        if self._opened:
+            return
+        self._opened = True
+        if self.path:
+            try:
+                self._open()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Transaction store disabled, cannot open {self.path}: {e}")
+                self._db = None
+
+    def _open(self):
+        """Open (and create if needed) the SQLite database."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS transactions ("
+            " network TEXT NOT NULL,"
+            " signature TEXT NOT NULL,"
+            " slot INTEGER,"
+            " response BLOB NOT NULL,"
+            " PRIMARY KEY (network, signature)"
+            ") WITHOUT ROWID"
+        )
+
+    async def get(self, network: str, signature: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a stored transaction.
+
+        Args:
+            network: Network name
+            signature: Transaction signature
+
+        Returns:
+            Optional[Dict]: Raw getTransaction result, or None if not stored
+        """
+        key = (network, signature)
+        response = self._memory.get(key)
+        if response is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return response
+
+        self._ensure_open()
+        if self._db is not None:
+            response = await asyncio.to_thread(self._read, key)
+            if response is not None:
+                self.disk_hits += 1
+                self._remember(key, response)
+                return response
+
+        self.misses += 1
+        return None
+
+    async def put(self, network: str, signature: str, response: Dict[str, Any]):
+        """
+        Store a finalized transaction.
+
+        Args:
+            network: Network name
+            signature: Transaction signature
+            response: Raw getTransaction result
+        """
+        key = (network, signature)
+        self._remember(key, response)
+        self.stored += 1
+        self._ensure_open()
+        if self._db is not None:
+            try:
+                await asyncio.to_thread(self._write, key, response)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist transaction {signature}: {e}")
+
+    def _remember(self, key: Tuple[str, str], response: Dict[str, Any]):
+        """Insert into the in-memory LRU."""
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _read(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """Read a transaction from disk."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response FROM transactions WHERE network = ? AND signature = ?", key
+            ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def _write(self, key: Tuple[str, str], response: Dict[str, Any]):
+        """Write a transaction to disk."""
+        blob = zlib.compress(json.dumps(response, separators=(",", ":")).encode())
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO transactions (network, signature, slot, response) VALUES (?, ?, ?, ?)",
+                (*key, response.get("slot"), blob),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return store counters."""
+        return {
+            "path": self.path if self._db is not None else None,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stored": self.stored,
+        }
+
+    def close(self):
+        """Close the database."""
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
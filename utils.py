@@ -16,13 +16,20 @@ COMMON_TOKENS = {
     "RAY": "4k3Dyjzvzp8eMZWUXbBCjEvwSkkk59S5iCNLY3QrkX6R",
     "SRM": "SRMuApVNdxXokk5GT7XD5cUUgXMBCoAz2LHeuAoKWRt",
     "ORCA": "orcaEKTdK7LKz57vaAYr9QeNsVEPfiu6QeMU1kektZE",
-    "MNGO": "MangoCzJ36AjZyKwVj3VnYU4GTonjfVEnJmvvWaxLac"
+    "MNGO": "MangoCzJ36AjZyKwVj3VnYU4GTonjfVEnJmvvWaxLac",
+    "JUP": "JUPyiwrYJFskUPiHa7hkeR8VUtAeFoSYbKedZNsDvCN",
+    "BONK": "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263",
+    "WIF": "EKpQGSJtjMFqKZ9KQanSqYXRcF8fBopzLHYxdM65zcjm",
+    "PYTH": "HZ1JovNiVvGrGNiiYvEozEVgZ58xaU3RKwX8eACQBCt3",
+    "MSOL": "mSoLzYCxHdYgdzU16g5QSh3i5K3z3KZK7ytfqcJm7So",
+    "JITOSOL": "J1toso1uCk3RLmjorhTtrVwY9HJ7X8V9yYac6Y7kGCPn"
 }
 
 # Common Solana program addresses
 PROGRAM_ADDRESSES = {
     "SYSTEM_PROGRAM": "11111111111111111111111111111111",
     "TOKEN_PROGRAM": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+    "TOKEN_2022_PROGRAM": "TokenzQdBNbLqP5VEhdkAS6EPFLC1PhnBqCXEpPxuEb",
     "ASSOCIATED_TOKEN_PROGRAM": "ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL",
     "RENT_PROGRAM": "SysvarRent111111111111111111111111111111111",
     "CLOCK_PROGRAM": "SysvarC1ock11111111111111111111111111111111"
@@ -240,4 +247,43 @@ def parse_transaction_logs(logs: List[str]) -> Dict[str, Union[str, List[str]]]:
             parsed["errors"].append(log)
             parsed["success"] = False
     
-    return parsed
\ No newline at end of file
+    return parsed
+
+def is_http2_available() -> bool:
+    """
+    Check whether httpx can negotiate HTTP/2 (requires the optional ``h2`` package).
+    
+    Returns:
+        bool: True if HTTP/2 is supported, False otherwise
+    """
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def is_numpy_available() -> bool:
+    """
+    Check whether the optional ``numpy`` package is installed (enables vectorized token decoding).
+    
+    Returns:
+        bool: True if NumPy can be imported, False otherwise
+    """
+    try:
+        import numpy  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def is_orjson_available() -> bool:
+    """
+    Check whether the optional ``orjson`` package is installed (enables fast response encoding).
+    
+    Returns:
+        bool: True if orjson can be imported, False otherwise
+    """
+    try:
+        import orjson  # noqa: F401
+        return True
+    except ImportError:
+        return False
@@ -0,0 +1,310 @@
+"""
+WebSocket subscriptions for the Solana MCP Server.
+
+One multiplexed WebSocket per network carries every active subscription
+(``accountSubscribe``, ``signatureSubscribe``, ``logsSubscribe`` and
+``slotSubscribe``). Identical subscriptions requested by several callers
+share one server-side subscription and are reference-counted. When the
+connection drops, the manager reconnects with exponential backoff and
+re-subscribes everything that is still referenced.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from single_flight import request_key
+
+logger = logging.getLogger(__name__)
+
+# Supported subscription methods and their unsubscribe counterparts
+UNSUBSCRIBE_METHODS = {
+    "accountSubscribe": "accountUnsubscribe",
+    "signatureSubscribe": "signatureUnsubscribe",
+    "logsSubscribe": "logsUnsubscribe",
+    "slotSubscribe": "slotUnsubscribe",
+}
+
+# Subscriptions the server ends by itself after their first notification
+ONE_SHOT_METHODS = {"signatureSubscribe"}
+
+NotificationCallback = Callable[[Any], None]
+StateCallback = Callable[[bool], None]
+
+@dataclass(eq=False)
+class Subscription:
+    """A server-side subscription shared by all handles with the same method and parameters."""
+    method: str
+    params: list
+    key: str
+    server_id: Optional[int] = None
+    notifications: int = 0
+    handles: List["SubscriptionHandle"] = field(default_factory=list)
+
+    @property
+    def refs(self) -> int:
+        """Number of callers holding this subscription."""
+        return len(self.handles)
+
+    @property
+    def active(self) -> bool:
+        """Whether the server has confirmed the subscription on the current connection."""
+        return self.server_id is not None
+
+@dataclass(eq=False)
+class SubscriptionHandle:
+    """One caller's reference to a subscription."""
+    subscription: Subscription
+    on_notification: Optional[NotificationCallback] = None
+    on_state: Optional[StateCallback] = None
+
+class SubscriptionManager:
+    """Multiplexed, reconnecting WebSocket subscriptions for one network."""
+
+    def __init__(
+        self,
+        ws_url: str,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30.0,
+        ping_interval: float = 20.0,
+    ):
+        """
+        Initialize the manager (the connection is opened on the first subscription).
+
+        Args:
+            ws_url: WebSocket RPC URL of the network
+            reconnect_delay: Initial delay before reconnecting, doubled after each failure
+            max_reconnect_delay: Upper bound for the reconnect delay
+            ping_interval: Seconds between keep-alive pings
+        """
+        self.ws_url = ws_url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+
+        self._subscriptions: Dict[str, Subscription] = {}
+        self._by_server_id: Dict[int, Subscription] = {}
+        self._pending: Dict[int, Subscription] = {}
+        self._ids = itertools.count(1)
+        self._ws: Any = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.connects = 0
+        self.notifications = 0
+        self.errors = 0
+
+    @property
+    def connected(self) -> bool:
+        """Whether the WebSocket is currently open."""
+        return self._ws is not None
+
+    async def subscribe(
+        self,
+        method: str,
+        params: list,
+        on_notification: Optional[NotificationCallback] = None,
+        on_state: Optional[StateCallback] = None,
+    ) -> SubscriptionHandle:
+        """
+        Subscribe, sharing an existing subscription with the same method and parameters.
+
+        Args:
+            method: Subscription method (e.g. "accountSubscribe")
+            params: Method parameters
+            on_notification: Called with the ``result`` of every notification
+            on_state: Called with True when the subscription becomes active and False when it is lost
+
+        Returns:
+            SubscriptionHandle: Handle to pass to ``unsubscribe``
+        """
+        if method not in UNSUBSCRIBE_METHODS:
+            raise ValueError(f"Unsupported subscription method: {method}")
+
+        key = request_key(method, params)
+        subscription = self._subscriptions.get(key)
+        if subscription is None:
+            subscription = Subscription(method, params, key)
+            self._subscriptions[key] = subscription
+            if self._ws is not None:
+                await self._send_subscribe(subscription)
+
+        handle = SubscriptionHandle(subscription, on_notification, on_state)
+        subscription.handles.append(handle)
+        if subscription.active and on_state is not None:
+            self._call(on_state, True)
+        self._ensure_running()
+        return handle
+
+    async def unsubscribe(self, handle: SubscriptionHandle):
+        """
+        Release a handle; the server-side subscription ends with its last handle.
+
+        Args:
+            handle: Handle returned by ``subscribe``
+        """
+        subscription = handle.subscription
+        if handle not in subscription.handles:
+            return
+        subscription.handles.remove(handle)
+        if subscription.handles:
+            return
+
+        if self._subscriptions.get(subscription.key) is subscription:
+            del self._subscriptions[subscription.key]
+        if subscription.server_id is not None:
+            server_id, subscription.server_id = subscription.server_id, None
+            self._by_server_id.pop(server_id, None)
+            await self._send_unsubscribe(subscription.method, server_id)
+
+    def _ensure_running(self):
+        """Start the connection task if it is not running."""
+        if not self._closed and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def _send(self, request_id: int, method: str, params: list):
+        """Send a JSON-RPC request on the open connection."""
+        await self._ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+
+    async def _send_subscribe(self, subscription: Subscription):
+        """Request a subscription; it becomes active when the server answers."""
+        request_id = next(self._ids)
+        self._pending[request_id] = subscription
+        try:
+            await self._send(request_id, subscription.method, subscription.params)
+        except Exception as e:
+            # The connection task re-subscribes after reconnecting
+            self._pending.pop(request_id, None)
+            logger.debug(f"Subscribe request failed on {self.ws_url}: {e}")
+
+    async def _send_unsubscribe(self, method: str, server_id: int):
+        """End a server-side subscription, ignoring a closed connection."""
+        if self._ws is None:
+            return
+        try:
+            await self._send(next(self._ids), UNSUBSCRIBE_METHODS[method], [server_id])
+        except Exception as e:
+            logger.debug(f"Unsubscribe request failed on {self.ws_url}: {e}")
+
+    async def _run(self):
+        """Keep the connection open, re-subscribing after every reconnect."""
+        import websockets
+
+        delay = self.reconnect_delay
+        while not self._closed:
+            try:
+                async with websockets.connect(self.ws_url, ping_interval=self.ping_interval, max_size=None) as ws:
+                    self._ws = ws
+                    self.connects += 1
+                    delay = self.reconnect_delay
+                    logger.info(f"Connected to {self.ws_url} ({len(self._subscriptions)} subscriptions)")
+                    for subscription in list(self._subscriptions.values()):
+                        await self._send_subscribe(subscription)
+                    async for message in ws:
+                        self._handle(json.loads(message))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"WebSocket connection to {self.ws_url} failed: {e}")
+            finally:
+                self._ws = None
+                self._deactivate_all()
+
+            if self._closed:
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _handle(self, message: Dict[str, Any]):
+        """Dispatch a subscribe response or a notification."""
+        if "id" in message:
+            subscription = self._pending.pop(message["id"], None)
+            if subscription is None:
+                return
+            if "error" in message:
+                self.errors += 1
+                logger.warning(f"{subscription.method} {subscription.params} rejected: {message['error']}")
+                return
+            server_id = message["result"]
+            if self._subscriptions.get(subscription.key) is not subscription:
+                # Released while the request was in flight
+                asyncio.create_task(self._send_unsubscribe(subscription.method, server_id))
+                return
+            subscription.server_id = server_id
+            self._by_server_id[server_id] = subscription
+            for handle in list(subscription.handles):
+                if handle.on_state is not None:
+                    self._call(handle.on_state, True)
+            return
+
+        params = message.get("params") or {}
+        subscription = self._by_server_id.get(params.get("subscription"))
+        if subscription is None:
+            return
+        subscription.notifications += 1
+        self.notifications += 1
+        if subscription.method in ONE_SHOT_METHODS:
+            # The server has already ended it; never re-subscribe after a reconnect
+            self._by_server_id.pop(subscription.server_id, None)
+            subscription.server_id = None
+            if self._subscriptions.get(subscription.key) is subscription:
+                del self._subscriptions[subscription.key]
+        for handle in list(subscription.handles):
+            if handle.on_notification is not None:
+                self._call(handle.on_notification, params.get("result"))
+
+    def _deactivate_all(self):
+        """Mark every subscription inactive after the connection is lost."""
+        self._pending.clear()
+        self._by_server_id.clear()
+        for subscription in self._subscriptions.values():
+            if subscription.server_id is None:
+                continue
+            subscription.server_id = None
+            for handle in list(subscription.handles):
+                if handle.on_state is not None:
+                    self._call(handle.on_state, False)
+
+    @staticmethod
+    def _call(callback: Callable[[Any], None], value: Any):
+        """Run a listener callback, logging instead of propagating its errors."""
+        try:
+            callback(value)
+        except Exception as e:
+            logger.error(f"Subscription listener failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connection and subscription counters."""
+        return {
+            "url": self.ws_url,
+            "connected": self.connected,
+            "connects": self.connects,
+            "notifications": self.notifications,
+            "errors": self.errors,
+            "subscriptions": [
+                {
+                    "method": subscription.method,
+                    "params": subscription.params,
+                    "refs": subscription.refs,
+                    "active": subscription.active,
+                    "notifications": subscription.notifications,
+                }
+                for subscription in self._subscriptions.values()
+            ],
+        }
+
+    async def close(self):
+        """Close the connection and drop all subscriptions."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._subscriptions.clear()